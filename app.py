@@ -2,8 +2,12 @@ import streamlit as st
 import subprocess
 import sys
 import os
+import time
 import base64
 
+from src.utils.resume_index import ResumeIndex
+from src.utils.workflow_server import DEFAULT_URL, server_available, submit
+
 # Set page configuration
 st.set_page_config(
     page_title="AI Talent Hub",
@@ -11,50 +15,58 @@ st.set_page_config(
     layout="wide"
 )
 
-# Function to run the command based on selected workflow
-def run_workflow(workflow, email=None, job_title=None, skills=None, experience=None):
-    cmd = ["python3", "main.py", "--workflow", workflow]
+# Workflow server that keeps the agents and models warm between clicks, started on first use
+@st.cache_resource
+def get_workflow_server():
+    if server_available(DEFAULT_URL):
+        return DEFAULT_URL
+    process = subprocess.Popen(["python3", "main.py", "--serve", "--server", DEFAULT_URL])
+    # The first start imports the agents, checks Ollama and loads the models
+    deadline = time.time() + 300
+    while time.time() < deadline:
+        if server_available(DEFAULT_URL):
+            return DEFAULT_URL
+        if process.poll() is not None:
+            raise RuntimeError(f"Workflow server exited with return code {process.returncode}")
+        time.sleep(0.5)
+    raise RuntimeError("Workflow server did not start in time")
+
+# Function to run the selected workflow on the workflow server
+def run_workflow(workflow, email=None, job_title=None, skills=None, experience=None, regenerate=False):
+    context = {"positions": "1"}
     
     if job_title:
-        cmd.extend(["--job-title", job_title])
+        context["job_title"] = job_title
     
     if skills:
-        cmd.extend(["--skills", skills])
+        context["skills"] = skills
     
     if experience:
-        cmd.extend(["--experience", experience])
+        context["experience"] = experience
     
     if email:
-        cmd.extend(["--email", email])
+        context["email"] = email
     
-    st.info(f"Running command: {' '.join(cmd)}")
+    st.info(f"Running workflow: {workflow}")
     
     try:
-        process = subprocess.Popen(
-            cmd, 
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True
-        )
+        if not server_available(DEFAULT_URL):
+            # The server was stopped since it was started; start a new one
+            get_workflow_server.clear()
+        url = get_workflow_server()
         
         # Display output in real-time
         output_placeholder = st.empty()
         output_text = ""
         
-        while True:
-            output = process.stdout.readline()
-            if output == '' and process.poll() is not None:
-                break
-            if output:
-                output_text += output
+        for event in submit(url, workflow, context, regenerate=regenerate):
+            if event["event"] == "output":
+                output_text += event["text"] + "\n"
                 output_placeholder.text_area("Output", output_text, height=400)
-        
-        # Get return code and remaining output
-        return_code = process.poll()
-        if return_code == 0:
-            st.success("Workflow completed successfully!")
-        else:
-            st.error(f"Workflow failed with return code {return_code}")
+            elif event["event"] == "completed":
+                st.success("Workflow completed successfully!")
+            elif event["event"] == "failed":
+                st.error(f"Workflow failed: {event['error']}")
             
     except Exception as e:
         st.error(f"Error executing workflow: {str(e)}")
@@ -70,10 +82,21 @@ def get_file_download_link(file_path):
     href = f'<a href="data:text/plain;base64,{b64}" download="{file_name}" target="_blank">{file_name}</a>'
     return href
 
+# Shared index of the resume store, kept in sync with uploads and deletes
+@st.cache_resource
+def get_resume_index():
+    return ResumeIndex("data/resumes")
+
+# Representative of each resume's near-duplicate cluster, reloaded only when the index changes
+@st.cache_data
+def get_duplicate_clusters(generation):
+    return get_resume_index().duplicates.clusters()
+
 # Function to delete a resume file
 def delete_resume(file_path):
     try:
         os.remove(file_path)
+        get_resume_index().remove(file_path)
         return True
     except Exception as e:
         st.error(f"Error deleting file: {str(e)}")
@@ -127,6 +150,11 @@ email = "airecruiter@talenthub.com"
 if 'deleted_resume' not in st.session_state:
     st.session_state.deleted_resume = None
 
+# Initialize session state for the last saved upload, so reruns do not save it again
+if 'saved_upload' not in st.session_state:
+    st.session_state.saved_upload = None
+    st.session_state.upload_duplicates = []
+
 # Create two columns for the form
 col1, col2 = st.columns(2)
 
@@ -136,14 +164,20 @@ with col1:
     uploaded_file = st.file_uploader("Upload a text resume", type=["txt"])
     
     if uploaded_file is not None:
-        # Create directory if it doesn't exist
-        os.makedirs("data/resumes", exist_ok=True)
-        
-        # Save the uploaded file
-        file_path = os.path.join("data/resumes", uploaded_file.name)
-        with open(file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
+        # The uploader keeps its file across reruns; only a new upload is saved and indexed
+        if st.session_state.saved_upload != uploaded_file.file_id:
+            # Create directory if it doesn't exist
+            os.makedirs("data/resumes", exist_ok=True)
+            
+            # Save the uploaded file
+            file_path = os.path.join("data/resumes", uploaded_file.name)
+            with open(file_path, "wb") as f:
+                f.write(uploaded_file.getbuffer())
+            st.session_state.upload_duplicates = get_resume_index().add(file_path)
+            st.session_state.saved_upload = uploaded_file.file_id
         st.success(f"Resume saved: {uploaded_file.name}")
+        if st.session_state.upload_duplicates:
+            st.warning(f"Possible near-duplicate of: {', '.join(st.session_state.upload_duplicates)}")
     
     # Display success message if a file was deleted
     if st.session_state.deleted_resume:
@@ -153,6 +187,8 @@ with col1:
     # Check if the directory exists
     if os.path.exists("data/resumes"):
         resumes = [f for f in os.listdir("data/resumes") if f.endswith(".txt")]
+        # Map each resume to the representative of its near-duplicate cluster
+        clusters = get_duplicate_clusters(get_resume_index().current_generation())
         if resumes:
             # Display the first 2 resumes
             for i, resume in enumerate(resumes[:2]):
@@ -161,6 +197,8 @@ with col1:
                 
                 with col_link:
                     st.markdown(get_file_download_link(resume_path), unsafe_allow_html=True)
+                    if clusters.get(resume, resume) != resume:
+                        st.caption(f"⚠️ Near-duplicate of {clusters[resume]}")
                 
                 with col_delete:
                     delete_key = f"delete_{i}"
@@ -178,6 +216,8 @@ with col1:
                         
                         with col_link:
                             st.markdown(get_file_download_link(resume_path), unsafe_allow_html=True)
+                            if clusters.get(resume, resume) != resume:
+                                st.caption(f"⚠️ Near-duplicate of {clusters[resume]}")
                         
                         with col_delete:
                             delete_key = f"delete_{i}"
@@ -198,6 +238,11 @@ with col2:
     job_title = st.text_input("Job Title", key="job_title", placeholder="e.g., Python Developer")
     skills = st.text_input("Skills (comma-separated)", key="skills", placeholder="e.g., Python, Django, Flask, FastAPI")
     experience = st.text_input("Experience Level", key="experience", placeholder="e.g., 3+ years")
+    regenerate = st.checkbox(
+        "Regenerate job description",
+        key="regenerate",
+        help="By default, a job description approved earlier for the same title, skills and experience is reused"
+    )
 
 # Workflow selection
 st.markdown("### Select Workflow")
@@ -211,28 +256,28 @@ with col1:
         if not job_title or not skills or not experience:
             st.warning("Please fill in all job requirement fields.")
         else:
-            run_workflow("recruitment_process", email, job_title, skills, experience)
+            run_workflow("recruitment_process", email, job_title, skills, experience, regenerate)
 
 with col2:
     if st.button("Job Posting", use_container_width=True):
         if not job_title or not skills or not experience:
             st.warning("Please fill in all job requirement fields.")
         else:
-            run_workflow("job_posting", email, job_title, skills, experience)
+            run_workflow("job_posting", email, job_title, skills, experience, regenerate)
 
 with col3:
     if st.button("Candidate Selection", use_container_width=True):
         if not job_title or not skills or not experience:
             st.warning("Please fill in all job requirement fields.")
         else:
-            run_workflow("candidate_selection", email, job_title, skills, experience)
+            run_workflow("candidate_selection", email, job_title, skills, experience, regenerate)
 
 with col4:
     if st.button("Interview Process", use_container_width=True):
         if not job_title or not skills or not experience:
             st.warning("Please fill in all job requirement fields.")
         else:
-            run_workflow("interview_process", email, job_title, skills, experience)
+            run_workflow("interview_process", email, job_title, skills, experience, regenerate)
 
 # Add information about the application
 st.markdown("---")
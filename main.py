@@ -1,33 +1,71 @@
 import os
 import sys
 import argparse
+import urllib.error
 import requests
-from typing import Dict, Any
+from typing import Dict, Any, List
+from urllib.parse import urlparse
 
-from src.utils import ConfigLoader, ModelConnector, AgentFactory, WorkflowEngine
+from src.utils import ConfigLoader, ModelConnector, AgentFactory, WorkflowEngine, ResumeIndex
+from src.utils.batch_runner import run_batch
+from src.utils.workflow_server import DEFAULT_URL, WorkflowServer, server_available, submit
 
 
-def check_ollama():
-    """Check if Ollama is installed and running with the llama3.1 model."""
+def configured_models(config_loader: ConfigLoader, model_connector: ModelConnector) -> List[str]:
+    """Collect the default model and every per-agent or per-task model override."""
+    models = [model_connector.get_model().model]
+    sections = list(config_loader.get_all_agents().values()) + list(config_loader.get_all_tasks().values())
+    for section in sections:
+        override = section.get("model")
+        name = override if isinstance(override, str) else (override or {}).get("name")
+        if name and name not in models:
+            models.append(name)
+    return models
+
+
+def check_ollama(model_connector: ModelConnector, required_models: List[str] = None):
+    """Check if Ollama is installed and running with the configured models."""
+    required_models = required_models or [model_connector.get_model().model]
+    model_name = required_models[0]
     try:
-        # Check if Ollama service is running
-        response = requests.get("http://localhost:11434/api/tags")
-        if response.status_code != 200:
-            print("Ollama service is not running. Please start Ollama.")
-            return False
-            
-        # Check if llama3.1 model is available
-        models = response.json().get("models", [])
-        if not any(model.get("name") == "llama3.1:latest" for model in models):
-            print("llama3.1:latest model not found. Please run 'ollama pull llama3.1' to download it.")
-            return False
-            
-        return True
+        # Check if Ollama service is running, over the connector's pooled session
+        models = model_connector.list_models()
+    except requests.HTTPError:
+        print("Ollama service is not running. Please start Ollama.")
+        return False
     except requests.RequestException:
         print("Could not connect to Ollama. Please make sure Ollama is installed and running.")
         print("You can install Ollama from: https://ollama.ai/")
-        print("After installation, run: ollama pull llama3.1")
+        print(f"After installation, run: ollama pull {model_name}")
         return False
+    
+    # Check if the configured models are available
+    missing = [name for name in required_models if name not in models]
+    for name in missing:
+        print(f"{name} model not found. Please run 'ollama pull {name}' to download it.")
+        
+    return not missing
+
+
+def run_on_server(url: str, workflow: str, context: Dict[str, Any], resume_run_id: str = None,
+                  regenerate: bool = False) -> int:
+    """Run a workflow on a running workflow server, printing its output as it arrives."""
+    try:
+        for event in submit(url, workflow, context, resume_run_id, regenerate):
+            if event["event"] == "output":
+                print(event["text"], flush=True)
+            elif event["event"] == "completed":
+                return 0
+            elif event["event"] == "failed":
+                if event.get("run_id"):
+                    print(f"Completed tasks are saved. Resume with: python main.py --resume {event['run_id']}")
+                return 1
+    except urllib.error.URLError as error:
+        print(f"Could not reach the workflow server at {url}: {error.reason}")
+        print("Start it with: python main.py --serve")
+        return 1
+    print("The workflow server closed the connection before the run ended.")
+    return 1
 
 
 def main():
@@ -45,11 +83,51 @@ def main():
     parser.add_argument("--email", default="recruiter@example.com", help="Recruiter email address")
     parser.add_argument("--positions", default="1", help="Number of open positions")
     parser.add_argument("--skip-check", action="store_true", help="Skip Ollama check")
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        help="Resume a failed run, reusing the outputs of the tasks it completed"
+    )
+    parser.add_argument(
+        "--regenerate",
+        action="store_true",
+        help="Generate a new job description even if one was approved for these requirements"
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Run the workflow for every requisition in a JSONL or CSV file"
+    )
+    parser.add_argument("--batch-output", metavar="FILE", help="JSONL file for batch results (default: FILE.results.jsonl)")
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes for batch mode")
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Start a workflow server that keeps agents and models loaded between runs"
+    )
+    parser.add_argument(
+        "--server",
+        metavar="URL",
+        help=f"Workflow server to run on (with --serve: address to bind), default {DEFAULT_URL}"
+    )
+    parser.add_argument(
+        "--local",
+        action="store_true",
+        help="Run in this process even if a workflow server is running, e.g. to answer review prompts"
+    )
     args = parser.parse_args()
     
-    # Check if Ollama is installed and running
-    if not args.skip_check and not check_ollama():
-        return 1
+    # Prepare context for the workflow
+    context = {
+        "job_title": args.job_title,
+        "skills": args.skills,
+        "experience": args.experience,
+        "email": args.email,
+        "positions": args.positions
+    }
+    if not args.serve and not args.batch and not args.local and (args.server or server_available(DEFAULT_URL)):
+        # A running server already holds the configuration, agents and models
+        return run_on_server(args.server or DEFAULT_URL, args.workflow, context, args.resume, args.regenerate)
     
     # Initialize configuration and model
     print("Initializing AI Talent Hub...")
@@ -57,25 +135,80 @@ def main():
     model_config = config_loader.get_model_config()
     model_connector = ModelConnector(model_config)
     
+    # Check if Ollama is installed and running
+    if not args.skip_check and not check_ollama(model_connector, configured_models(config_loader, model_connector)):
+        return 1
+    
+    # Reconcile the resume index with the resume store before ranking anything
+    ranker_config = config_loader.get_agent_config("resume_ranker") or {}
+    resume_index = ResumeIndex(ranker_config.get("resume_dir", "./data/resumes"), ranker_config.get("index_path"))
+    updated, removed = resume_index.sync()
+    print(f"Resume index up to date ({updated} indexed, {removed} removed)")
+    
+    if args.batch:
+        # Requisitions fill in job_title, skills and experience; the other arguments are defaults
+        output_path = args.batch_output or f"{os.path.splitext(args.batch)[0]}.results.jsonl"
+        summary = run_batch(
+            args.batch,
+            output_path,
+            args.workflow,
+            defaults={"email": args.email, "positions": args.positions},
+            workers=args.workers,
+            regenerate=args.regenerate
+        )
+        metrics = summary.pop("metrics")
+        print("\nBatch summary:")
+        for name, value in summary.items():
+            print(f"{name}: {value:.2f}" if isinstance(value, float) else f"{name}: {value}")
+        for name, value in sorted(metrics.items()):
+            print(f"{name}: {value:g}")
+        return 1 if summary["failed"] else 0
+    
     # Create agent factory and workflow engine
     agent_factory = AgentFactory(config_loader, model_connector)
+    
+    if args.serve:
+        url = args.server or DEFAULT_URL
+        address = urlparse(url)
+        # Jobs come from clients that cannot answer review prompts on the server's terminal
+        workflow_engine = WorkflowEngine(config_loader, agent_factory, human_input=False)
+        workflow_server = WorkflowServer(workflow_engine, resume_index)
+        workflow_server.warm()
+        server = workflow_server.serve(address.hostname, address.port)
+        print(f"Workflow server on {url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            model_connector.close()
+        return 0
+    
     workflow_engine = WorkflowEngine(config_loader, agent_factory)
+    workflow = args.workflow
     
-    # Prepare context for the workflow
-    context = {
-        "job_title": args.job_title,
-        "skills": args.skills,
-        "experience": args.experience,
-        "email": args.email,
-        "positions": args.positions
-    }
+    if args.resume:
+        # A resumed run keeps the workflow and inputs it was started with
+        try:
+            run = workflow_engine.run_store.load(args.resume)
+        except ValueError as error:
+            print(error)
+            return 1
+        if not run:
+            print(f"No checkpoints found for run ID: {args.resume}")
+            return 1
+        workflow = run["workflow_id"]
+        context = run["context"]
     
     # Run the selected workflow
     try:
-        print(f"Starting workflow: {args.workflow}")
-        workflow_engine.run_workflow(args.workflow, context)
+        print(f"Starting workflow: {workflow}")
+        workflow_engine.run_workflow(workflow, context, args.resume, args.regenerate)
     except Exception as e:
         print(f"Error running workflow: {e}")
+        if getattr(e, "run_id", None):
+            print(f"Completed tasks are saved. Resume with: python main.py --resume {e.run_id}")
         return 1
         
     return 0
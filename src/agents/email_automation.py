@@ -1,6 +1,9 @@
 from typing import Dict, Any, List
 from crewai import Agent, Task
 
+from src.utils.prompts import agent_messages
+from src.utils.resume_extractor import resume_profile
+
 
 class EmailAutomation:
     """
@@ -61,7 +64,8 @@ class EmailAutomation:
         print(output)
         print("="*50)
     
-    def generate_candidate_email(self, job_title: str, candidate_name: str, is_selected: bool) -> str:
+    def generate_candidate_email(self, job_title: str, candidate_name: str, is_selected: bool,
+                                 resume: str = "") -> str:
         """
         Generate an email for a candidate.
         
@@ -69,17 +73,33 @@ class EmailAutomation:
             job_title: Title of the job
             candidate_name: Name of the candidate
             is_selected: Whether the candidate is selected for interview
+            resume: Candidate's resume text, summarized so the email can mention their qualifications
             
         Returns:
             str: Generated email content
         """
+        prompt = self._candidate_email_prompt(job_title, candidate_name, is_selected, resume)
+        return self.agent.execute_task(prompt)
+    
+    async def agenerate_candidate_email(self, job_title: str, candidate_name: str, is_selected: bool,
+                                        resume: str = "") -> str:
+        """Async variant of `generate_candidate_email` for sending many emails concurrently."""
+        prompt = self._candidate_email_prompt(job_title, candidate_name, is_selected, resume)
+        return await self.llm.acall(agent_messages(self.config, prompt))
+    
+    def _candidate_email_prompt(self, job_title: str, candidate_name: str, is_selected: bool,
+                                resume: str = "") -> str:
+        """Build the prompt for a candidate email."""
         email_type = "selection" if is_selected else "rejection"
+        profile = f"CANDIDATE PROFILE:\n{resume_profile(resume)}" if resume else ""
         
-        prompt = f"""
+        return f"""
         Generate a professional email to {candidate_name} regarding their application for the {job_title} position.
         
         This is a {email_type} email.
         
+        {profile}
+        
         If this is a selection email, include:
         1. Congratulations on being selected for an interview
         2. Brief mention of their qualifications that stood out
@@ -94,8 +114,6 @@ class EmailAutomation:
         
         The email should be professional, warm, and concise.
         """
-        
-        return self.agent.execute_task(prompt)
     
     def generate_hiring_team_email(self, job_title: str, candidate_names: List[str]) -> str:
         """
@@ -108,9 +126,18 @@ class EmailAutomation:
         Returns:
             str: Generated email content
         """
+        return self.agent.execute_task(self._hiring_team_email_prompt(job_title, candidate_names))
+    
+    async def agenerate_hiring_team_email(self, job_title: str, candidate_names: List[str]) -> str:
+        """Async variant of `generate_hiring_team_email`."""
+        prompt = self._hiring_team_email_prompt(job_title, candidate_names)
+        return await self.llm.acall(agent_messages(self.config, prompt))
+    
+    def _hiring_team_email_prompt(self, job_title: str, candidate_names: List[str]) -> str:
+        """Build the prompt for a hiring team email."""
         candidates_str = ", ".join(candidate_names)
         
-        prompt = f"""
+        return f"""
         Generate a professional email to the hiring team regarding candidates for the {job_title} position.
         
         The following candidates have been selected for interviews: {candidates_str}
@@ -123,8 +150,6 @@ class EmailAutomation:
         
         The email should be professional, concise, and action-oriented.
         """
-        
-        return self.agent.execute_task(prompt)
     
     def mock_send_email(self, recipient: str, subject: str, content: str) -> Dict[str, Any]:
         """
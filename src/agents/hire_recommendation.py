@@ -1,6 +1,18 @@
+import re
 from typing import Dict, Any, Tuple, List
 from crewai import Agent, Task
 
+from src.utils.prompts import agent_messages, fit_sections, layered_prompt
+from src.utils.resume_extractor import resume_profile
+
+# Machine-readable last line of every recommendation, used to compare candidates
+VERDICT_INSTRUCTION = (
+    "End your answer with one line in exactly this form: "
+    "VERDICT: <Hire, Consider or Do Not Hire>; SCORE: <confidence from 0-100>"
+)
+VERDICT_LINE = re.compile(r"VERDICT:\s*\**\s*(Do Not Hire|Hire|Consider)\b.*?SCORE:\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
+DECISIONS = {"hire": "Hire", "consider": "Consider", "do not hire": "Do Not Hire"}
+
 
 class HireRecommendation:
     """
@@ -41,7 +53,7 @@ class HireRecommendation:
             Task: Configured task instance
         """
         return Task(
-            description=task_config.get("description"),
+            description=f"{task_config.get('description')}\n\n{VERDICT_INSTRUCTION}",
             expected_output=task_config.get("expected_output"),
             agent=self.agent,
             human_input_mode="ALWAYS" if task_config.get("human_input_required", False) else "NEVER",
@@ -73,18 +85,38 @@ class HireRecommendation:
         Returns:
             Dict[str, Any]: Analysis results including strengths, weaknesses, and recommendation
         """
-        prompt = f"""
-        Analyze this interview transcript and provide a hiring recommendation.
+        analysis_text = self.agent.execute_task(
+            layered_prompt(*self._analysis_prompt(job_description, resume, interview_transcript))
+        )
+        return self._recommendation(analysis_text)
+    
+    async def aanalyze_interview(self, job_description: str, resume: str, interview_transcript: str) -> Dict[str, Any]:
+        """Async variant of `analyze_interview`."""
+        shared, prompt = self._analysis_prompt(job_description, resume, interview_transcript)
+        analysis_text = await self.llm.acall(agent_messages(self.config, prompt, shared))
+        return self._recommendation(analysis_text)
+    
+    def _analysis_prompt(self, job_description: str, resume: str, interview_transcript: str) -> Tuple[str, str]:
+        """
+        Build the prompt for an interview analysis as (shared, per-candidate) parts.
+        
+        Long interviews are shortened to the model's token budget, keeping the
+        beginning and end of the transcript, instead of overflowing the context.
+        """
+        sections = fit_sections(
+            self.llm, self.config, self._analysis_layout,
+            [job_description, resume_profile(resume), interview_transcript]
+        )
+        return self._analysis_layout(*sections)
+    
+    def _analysis_layout(self, job_description: str, profile: str, interview_transcript: str) -> Tuple[str, str]:
+        """Lay out the analysis prompt around its variable sections."""
+        shared = f"""
+        Analyze the candidate's interview transcript and provide a hiring recommendation.
         
         JOB DESCRIPTION:
         {job_description}
         
-        CANDIDATE RESUME:
-        {resume}
-        
-        INTERVIEW TRANSCRIPT:
-        {interview_transcript}
-        
         Please provide a comprehensive analysis that includes:
         
         1. Key strengths demonstrated in the interview (minimum 3)
@@ -96,10 +128,19 @@ class HireRecommendation:
         7. Justification for your recommendation (3-5 sentences)
         
         Structure your response with clear headings and concise bullet points where appropriate.
+        {VERDICT_INSTRUCTION}
         """
+        prompt = f"""
+        CANDIDATE PROFILE:
+        {profile}
         
-        analysis_text = self.agent.execute_task(prompt)
-        
+        INTERVIEW TRANSCRIPT:
+        {interview_transcript}
+        """
+        return shared, prompt
+    
+    def _recommendation(self, analysis_text: str) -> Dict[str, Any]:
+        """Package the analysis text with the extracted hire decision."""
         # For a real application, we would parse the text into a structured format
         # For simplicity, we'll return it as is with a mock decision
         recommendation = self._extract_hire_decision(analysis_text)
@@ -111,6 +152,10 @@ class HireRecommendation:
             "timestamp": "2023-xx-xx xx:xx:xx"
         }
     
+    def hire_decision(self, analysis_text: str) -> Tuple[str, float]:
+        """Get the hire decision and confidence stated in an analysis, e.g. to compare candidates."""
+        return self._extract_hire_decision(analysis_text)
+    
     def _extract_hire_decision(self, analysis_text: str) -> Tuple[str, float]:
         """
         Extract the hire decision and confidence from the analysis text.
@@ -121,8 +166,13 @@ class HireRecommendation:
         Returns:
             Tuple[str, float]: The hire decision and confidence score
         """
-        # This is a simple implementation; in a real application, we would use more 
-        # sophisticated NLP to extract the decision and confidence
+        # The VERDICT line the prompts ask for; the last one wins if the model repeats it
+        verdicts = VERDICT_LINE.findall(analysis_text)
+        if verdicts:
+            decision, score = verdicts[-1]
+            return DECISIONS[decision.lower()], max(0.0, min(100.0, float(score))) / 100
+        
+        # Without a VERDICT line, fall back to keywords in the free-form text
         
         if "hire" in analysis_text.lower():
             if "do not hire" in analysis_text.lower() or "don't hire" in analysis_text.lower():
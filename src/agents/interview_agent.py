@@ -1,6 +1,9 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from crewai import Agent, Task
 
+from src.utils.prompts import agent_messages, layered_prompt
+from src.utils.resume_extractor import resume_profile
+
 
 class InterviewAgent:
     """
@@ -72,15 +75,25 @@ class InterviewAgent:
         Returns:
             List[str]: List of tailored interview questions
         """
-        prompt = f"""
+        questions_text = self.agent.execute_task(
+            layered_prompt(*self._questions_prompt(job_description, resume))
+        )
+        return self._parse_questions(questions_text)
+    
+    async def aprepare_interview_questions(self, job_description: str, resume: str) -> List[str]:
+        """Async variant of `prepare_interview_questions`."""
+        shared, prompt = self._questions_prompt(job_description, resume)
+        questions_text = await self.llm.acall(agent_messages(self.config, prompt, shared))
+        return self._parse_questions(questions_text)
+    
+    def _questions_prompt(self, job_description: str, resume: str) -> Tuple[str, str]:
+        """Build the prompt for tailored interview questions as (shared, per-candidate) parts."""
+        shared = f"""
         I need to create 5-7 interview questions for a candidate based on their resume and the job description.
         
         JOB DESCRIPTION:
         {job_description}
         
-        CANDIDATE RESUME:
-        {resume}
-        
         Please create questions that:
         1. Assess technical skills relevant to the job
         2. Evaluate past experience and achievements
@@ -91,9 +104,14 @@ class InterviewAgent:
         The questions should be detailed, specific to this candidate's background, and designed to reveal their suitability for this particular role.
         Return only the list of numbered questions without any other text.
         """
-        
-        questions_text = self.agent.execute_task(prompt)
-        
+        prompt = f"""
+        CANDIDATE PROFILE:
+        {resume_profile(resume)}
+        """
+        return shared, prompt
+    
+    def _parse_questions(self, questions_text: str) -> List[str]:
+        """Convert the numbered question list returned by the model into a list."""
         # Convert the text into a list of questions
         questions = []
         for line in questions_text.strip().split('\n'):
@@ -121,22 +139,28 @@ class InterviewAgent:
         # For demonstration, we'll simulate the interview with the AI playing both roles
         
         questions = self.prepare_interview_questions(job_description, resume)
-        
-        prompt = f"""
-        Conduct a simulated interview with {candidate_name} for a position described as:
+        return self.agent.execute_task(
+            layered_prompt(*self._interview_prompt(job_description, resume, candidate_name, questions))
+        )
+    
+    async def aconduct_interview(self, job_description: str, resume: str, candidate_name: str) -> str:
+        """Async variant of `conduct_interview`."""
+        questions = await self.aprepare_interview_questions(job_description, resume)
+        shared, prompt = self._interview_prompt(job_description, resume, candidate_name, questions)
+        return await self.llm.acall(agent_messages(self.config, prompt, shared))
+    
+    def _interview_prompt(self, job_description: str, resume: str, candidate_name: str,
+                          questions: List[str]) -> Tuple[str, str]:
+        """Build the prompt for a simulated interview as (shared, per-candidate) parts."""
+        shared = f"""
+        Conduct a simulated interview with a candidate for a position described as:
         
         JOB DESCRIPTION:
         {job_description}
         
-        CANDIDATE RESUME:
-        {resume}
-        
-        Use these questions as the basis for the interview:
-        {chr(10).join([f"{i+1}. {q}" for i, q in enumerate(questions)])}
-        
         For each question:
         1. Ask the question
-        2. Generate a realistic candidate response based on their resume
+        2. Generate a realistic candidate response based on their profile
         3. Follow up with a relevant question based on their response
         4. Generate another realistic response
         5. Move to the next question
@@ -145,8 +169,16 @@ class InterviewAgent:
         Begin with a brief introduction and end with a conclusion thanking the candidate.
         Make the responses realistic, not perfect, showing both strengths and areas for improvement.
         """
+        prompt = f"""
+        CANDIDATE NAME: {candidate_name}
+        
+        CANDIDATE PROFILE:
+        {resume_profile(resume)}
         
-        return self.agent.execute_task(prompt)
+        Use these questions as the basis for the interview:
+        {chr(10).join([f"{i+1}. {q}" for i, q in enumerate(questions)])}
+        """
+        return shared, prompt
     
     def conduct_interactive_interview(self, job_description: str, resume: str) -> str:
         """
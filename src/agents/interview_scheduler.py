@@ -3,6 +3,8 @@ from crewai import Agent, Task
 import datetime
 import json
 
+from src.utils.prompts import agent_messages
+
 
 class InterviewScheduler:
     """
@@ -77,6 +79,20 @@ class InterviewScheduler:
         Returns:
             Dict[str, Any]: Interview details
         """
+        prompt = self._schedule_prompt(candidate_name, job_title, interviewers, candidate_availability)
+        scheduling_result = self.agent.execute_task(prompt)
+        return self._interview_details(candidate_name, job_title, interviewers, scheduling_result)
+    
+    async def aschedule_interview(self, candidate_name: str, job_title: str, interviewers: List[str],
+                                  candidate_availability: List[str] = None) -> Dict[str, Any]:
+        """Async variant of `schedule_interview`."""
+        prompt = self._schedule_prompt(candidate_name, job_title, interviewers, candidate_availability)
+        scheduling_result = await self.llm.acall(agent_messages(self.config, prompt))
+        return self._interview_details(candidate_name, job_title, interviewers, scheduling_result)
+    
+    def _schedule_prompt(self, candidate_name: str, job_title: str, interviewers: List[str],
+                         candidate_availability: List[str] = None) -> str:
+        """Build the prompt for scheduling an interview."""
         if candidate_availability is None:
             # Mock some availability if none provided
             start_date = datetime.datetime.now() + datetime.timedelta(days=3)
@@ -85,7 +101,7 @@ class InterviewScheduler:
                 for i in range(5)
             ]
         
-        prompt = f"""
+        return f"""
         Schedule an interview for {candidate_name} for the {job_title} position.
         
         The interview panel includes: {', '.join(interviewers)}
@@ -101,9 +117,10 @@ class InterviewScheduler:
         
         Provide a response that includes all these details in a structured format.
         """
-        
-        scheduling_result = self.agent.execute_task(prompt)
-        
+    
+    def _interview_details(self, candidate_name: str, job_title: str, interviewers: List[str],
+                           scheduling_result: str) -> Dict[str, Any]:
+        """Mock the calendar invite and package the scheduling result."""
         # For demonstration purposes, we'll mock a calendar invite
         calendar_invite = self.mock_calendar_invite(
             candidate_name=candidate_name,
@@ -1,6 +1,8 @@
 from typing import Dict, Any
 from crewai import Agent, Task
 
+from src.utils.prompts import agent_messages
+
 
 class JobDescriptionGenerator:
     """
@@ -73,7 +75,16 @@ class JobDescriptionGenerator:
         Returns:
             str: Generated job description
         """
-        prompt = f"""
+        return self.agent.execute_task(self._job_description_prompt(title, skills, experience))
+    
+    async def agenerate_job_description(self, title: str, skills: str, experience: str) -> str:
+        """Async variant of `generate_job_description`."""
+        prompt = self._job_description_prompt(title, skills, experience)
+        return await self.llm.acall(agent_messages(self.config, prompt))
+    
+    def _job_description_prompt(self, title: str, skills: str, experience: str) -> str:
+        """Build the prompt for a job description."""
+        return f"""
         Create a comprehensive job description for a {title} position.
         
         Required Skills:
@@ -92,6 +103,4 @@ class JobDescriptionGenerator:
         7. Equal opportunity statement
         
         Make the job description engaging, professional, and thorough.
-        """
-        
-        return self.agent.execute_task(prompt) 
\ No newline at end of file
+        """
\ No newline at end of file
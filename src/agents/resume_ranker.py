@@ -1,7 +1,72 @@
 import os
-from typing import Dict, Any, List
+import re
+import json
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple
 from crewai import Agent, Task
-from crewai_tools import DirectoryReadTool, FileReadTool
+from crewai.tasks.task_output import TaskOutput
+from crewai_tools import FileReadTool
+from pydantic import PrivateAttr
+
+from src.utils.embedding_index import EmbeddingIndex
+from src.utils.prompts import agent_messages
+from src.utils.resume_index import ResumeIndex
+from src.utils.resume_extractor import format_profile
+from src.utils.score_cache import ScoreCache, strip_context_labels
+from src.utils.skill_matcher import SkillMatcher
+
+# One candidate of a ranking report, e.g. "1. Jane Doe (jane_doe.txt) - Match score: 87"
+RANKING_LINE = re.compile(
+    r"^\s*\d+\.\s*(?P<name>.+?)\s*\((?P<file>[^()]+?)\)\s*-\s*Match score:\s*(?P<score>\d+(?:\.\d+)?)",
+    re.MULTILINE | re.IGNORECASE
+)
+
+# Version of the map-reduce scoring prompt; bump it whenever the prompt or its
+# JSON format changes so scores cached for the old prompt are not reused
+SCORE_PROMPT_VERSION = "1"
+
+
+class RankingTask(Task):
+    """
+    Task that shortlists resumes against the job description it receives when it runs.
+    
+    With `_rank` set, the shortlist is ranked with map-reduce scoring in Python
+    instead of an agent prompt; otherwise `_describe` adds the shortlist to the
+    description and the agent ranks it.
+    """
+    
+    _rank: Any = PrivateAttr(default=None)
+    _describe: Any = PrivateAttr(default=None)
+    
+    def execute_sync(self, agent=None, context=None, tools=None) -> TaskOutput:
+        """
+        Rank the resumes shortlisted for the upstream output (the job description).
+        
+        Args:
+            agent: Agent the task runs as
+            context: Outputs of the upstream tasks
+            tools: Tools of an agent ranking; map-reduce scoring calls the LLM directly
+            
+        Returns:
+            TaskOutput: Ranking report
+        """
+        if self._rank is None:
+            self.description = self._describe(context or self.description)
+            return super().execute_sync(agent=agent, context=context, tools=tools)
+        
+        agent = agent or self.agent
+        output = TaskOutput(
+            description=self.description,
+            expected_output=self.expected_output,
+            raw=self._rank(context or self.description),
+            agent=agent.role if agent else ""
+        )
+        self.output = output
+        if self.callback:
+            self.callback(output)
+        return output
 
 
 class ResumeRanker:
@@ -9,22 +74,45 @@ class ResumeRanker:
     Agent that ranks resumes based on their match to a job description.
     """
     
-    def __init__(self, config: Dict[str, Any], llm):
+    def __init__(self, config: Dict[str, Any], llm, model_connector=None):
         """
         Initialize the Resume Ranker agent.
         
         Args:
             config: Agent configuration from YAML
             llm: Language model instance
+            model_connector: Model connector, required for semantic retrieval
         """
         self.config = config
         self.llm = llm
+        self.shortlist_size = self.config.get("shortlist_size", 10)
+        self.ranking_mode = self.config.get("ranking_mode", "agent")
+        self.max_workers = self.config.get("max_workers", 4)
+        self.batch_size = self.config.get("batch_size", 1)
+        self.min_score = self.config.get("min_score", 80)
+        self.min_skill_coverage = self.config.get("min_skill_coverage", 0.0)
+        self.last_ranking = []
+        self.score_cache = ScoreCache(
+            self.config.get("score_cache_path", "./data/index/score_cache.db"),
+            self.config.get("score_cache_size", 10000)
+        )
+        self.resume_index = ResumeIndex(
+            self.config.get("resume_dir", "./data/resumes"),
+            self.config.get("index_path")
+        )
+        self.skill_matcher = SkillMatcher(self.resume_index)
+        self.embedding_index = None
+        if self.config.get("retrieval", "lexical") == "semantic" and model_connector is not None:
+            self.embedding_index = EmbeddingIndex(
+                model_connector,
+                self.config.get("embedding_dir", "./data/index/embeddings"),
+                exact_limit=self.config.get("embedding_exact_limit", 20000)
+            )
         self.agent = self._create_agent()
         
     def _create_agent(self) -> Agent:
         """Create and configure the agent."""
-        # Initialize tools for reading resumes
-        self.dir_tool = DirectoryReadTool(directory="./data/resumes", description="Lists all resume files in a directory")
+        # The lexical index picks the shortlist, so the agent only needs to read files
         self.file_tool = FileReadTool(description="Reads the content of a resume file")
         
         return Agent(
@@ -33,7 +121,7 @@ class ResumeRanker:
             backstory=self.config.get("backstory"),
             verbose=self.config.get("verbose", True),
             allow_delegation=self.config.get("allow_delegation", False),
-            tools=[self.dir_tool, self.file_tool],
+            tools=[self.file_tool],
             llm=self.llm
         )
     
@@ -41,19 +129,52 @@ class ResumeRanker:
         """
         Create a task for ranking resumes.
         
+        The resumes are shortlisted when the task runs, against the job
+        description it receives from its upstream task (or its own description
+        when it has none). With `ranking_mode: map_reduce` the task scores the
+        shortlist in parallel LLM calls and merges the scores in Python.
+        
         Args:
             task_config: Task configuration from YAML
             
         Returns:
             Task: Configured task instance
         """
-        return Task(
-            description=task_config.get("description"),
+        description = task_config.get("description", "")
+        skills = task_config.get("context", {}).get("skills", "")
+        experience = task_config.get("context", {}).get("experience", "")
+        
+        def shortlist(job_description: str) -> List[str]:
+            return self.shortlist(f"{skills}\n{experience}\n{strip_context_labels(job_description)}", skills)
+        
+        if self.ranking_mode == "map_reduce":
+            task = RankingTask(
+                description=description,
+                expected_output=task_config.get("expected_output"),
+                agent=self.agent,
+                callback=self._task_callback
+            )
+            task._rank = lambda job_description: self._rank_map_reduce(
+                job_description, shortlist(job_description), skills
+            )
+            return task
+        
+        # Downstream per-candidate stages read the final list in the map-reduce report format
+        final_list = (
+            f"End with the final ranked list of candidates scoring {self.min_score} or higher, "
+            "one per line in exactly this form: <rank>. <candidate name> (<resume file name>) - Match score: <0-100>"
+        )
+        task = RankingTask(
+            description=description,
             expected_output=task_config.get("expected_output"),
             agent=self.agent,
             human_input_mode="ALWAYS" if task_config.get("human_input_required", False) else "NEVER",
             callback=self._task_callback
         )
+        task._describe = lambda job_description: (
+            f"{description}\n\n{self._format_shortlist(shortlist(job_description), skills)}\n\n{final_list}"
+        )
+        return task
     
     def _task_callback(self, output: str) -> None:
         """
@@ -68,22 +189,146 @@ class ResumeRanker:
         print(output)
         print("="*50)
     
-    def rank_resumes(self, job_description: str) -> str:
+    def shortlist(self, query: str, skills: str = "") -> List[str]:
+        """
+        Select the resumes most relevant to a query.
+        
+        When skills are given, the skill matrix runs first: resumes below
+        `min_skill_coverage` are dropped and the rest are ordered by skill
+        coverage, with lexical (or, with `retrieval: semantic`, embedding)
+        similarity breaking ties. Only the best ranked resume of each
+        near-duplicate cluster is kept.
+        
+        Args:
+            query: Skills, experience and/or job description text
+            skills: Comma-separated required skills
+            
+        Returns:
+            List[str]: Paths of the top `shortlist_size` resumes, best match first
+        """
+        self.resume_index.build()
+        if self.embedding_index is not None:
+            relevance = self._semantic_scores(query)
+        else:
+            relevance = self.resume_index.scores(query)
+        coverage = self.skill_matcher.coverage(skills) if skills else {}
+        candidates = [
+            (coverage.get(path, 0.0), float(score), path)
+            for path, score in zip(self.resume_index.file_paths, relevance)
+            if not skills or coverage.get(path, 0.0) >= self.min_skill_coverage
+        ]
+        candidates.sort(key=lambda candidate: (-candidate[0], -candidate[1], candidate[2]))
+        
+        clusters = self.resume_index.duplicates.clusters()
+        shortlist = []
+        seen_clusters = set()
+        for _, _, path in candidates:
+            if len(shortlist) >= self.shortlist_size:
+                break
+            cluster = clusters.get(os.path.basename(path), path)
+            if cluster not in seen_clusters:
+                seen_clusters.add(cluster)
+                shortlist.append(path)
+        return shortlist
+    
+    def candidates(self, ranking: str, limit: int = None) -> List[Dict[str, Any]]:
+        """
+        Select the candidates of a ranking that downstream per-candidate stages process, best first.
+        
+        The candidates are read from the ranking report itself (the output of the
+        `rank_resumes` task, possibly restored from a checkpoint) rather than from
+        agent state, so runs sharing this agent never see each other's ranking.
+        
+        Args:
+            ranking: Ranking report with lines like "1. Jane Doe (jane_doe.txt) - Match score: 87"
+            limit: Maximum number of candidates
+            
+        Returns:
+            List[Dict[str, Any]]: name, file, path and score of each candidate at or above `min_score`
+        """
+        selected = []
+        seen = set()
+        for match in RANKING_LINE.finditer(ranking):
+            file_name = os.path.basename(match.group("file").strip())
+            path = os.path.join(self.resume_index.resume_dir, file_name)
+            score = float(match.group("score"))
+            if file_name in seen or score < self.min_score or not os.path.isfile(path):
+                continue
+            seen.add(file_name)
+            selected.append({"name": match.group("name").strip(" *"), "file": file_name, "path": path, "score": score})
+        selected.sort(key=lambda candidate: -candidate["score"])
+        return selected[:limit] if limit else selected
+    
+    def _semantic_scores(self, query: str) -> List[float]:
+        """
+        Embedding similarity of every indexed resume to the query.
+        
+        Only resumes whose content hash has no stored vector are read and embedded.
+        
+        Args:
+            query: Skills, experience and/or job description text
+            
+        Returns:
+            List[float]: Cosine similarity aligned with the resume index file paths
+        """
+        hashes = self.resume_index.content_hashes()
+        keys = [hashes.get(path, "") for path in self.resume_index.file_paths]
+        
+        missing = []
+        for path, key in zip(self.resume_index.file_paths, keys):
+            if key and key not in self.embedding_index.rows:
+                with open(path, "r", encoding="utf-8", errors="ignore") as file:
+                    missing.append((key, file.read()))
+        self.embedding_index.update(missing)
+        
+        return self.embedding_index.scores(query, keys)
+    
+    def _format_evidence(self, evidence: Dict[str, Any]) -> str:
+        """Render skill coverage evidence on one line."""
+        matched = ", ".join(evidence["matched_skills"]) or "none"
+        missing = ", ".join(evidence["missing_skills"]) or "none"
+        return f"skill coverage {evidence['coverage']:.0%} (matched: {matched}; missing: {missing})"
+    
+    def _format_shortlist(self, shortlist: List[str], skills: str = "") -> str:
+        """Render the shortlisted resume paths, with skill evidence, for inclusion in a prompt."""
+        if not shortlist:
+            return "No resume files matched the job requirements."
+        if skills:
+            files = "\n".join(
+                f"- {path} [{self._format_evidence(self.skill_matcher.evidence(path, skills))}]"
+                for path in shortlist
+            )
+        else:
+            files = "\n".join(f"- {path}" for path in shortlist)
+        return f"Read and rank only these shortlisted resume files:\n{files}"
+    
+    def rank_resumes(self, job_description: str, skills: str = "", experience: str = "") -> str:
         """
         Rank resumes based on their match to the job description.
         
         Args:
             job_description: Job description to match against
+            skills: Required skills, used to shortlist resumes
+            experience: Required experience, used to shortlist resumes
             
         Returns:
             str: ranked list of resumes with scores and justification
         """
-        # The tools are now embedded in the agent, so we let the agent handle the directory and file reading
+        shortlist = self.shortlist(f"{skills}\n{experience}\n{job_description}", skills)
+        
+        if self.ranking_mode == "map_reduce":
+            return self._rank_map_reduce(job_description, shortlist, skills)
+        
         prompt = f"""
         Rank candidate resumes based on their match to the generated job description.
         
-        First, list all resume files and then, read the content of each resume file.
-        IMPORTANT: Only include candidates with a match score of 80 or higher in the final selection.
+        JOB DESCRIPTION:
+        {job_description}
+        
+        {self._format_shortlist(shortlist, skills)}
+        
+        Read the content of each shortlisted resume file.
+        IMPORTANT: Only include candidates with a match score of {self.min_score} or higher in the final selection.
         
         For each resume, provide:
         1. The candidate's name from the resume
@@ -94,7 +339,250 @@ class ResumeRanker:
         
         Then, Sort the candidates list from highest to lowest match score and 
         provide a final ranked list from best match to worst match while
-        only including candidates with a score of 80 or higher.
+        only including candidates with a score of {self.min_score} or higher.
+        """
+        
+        return self.agent.execute_task(prompt) 
+    
+    async def arank_resumes(self, job_description: str, skills: str = "", experience: str = "") -> str:
+        """
+        Async variant of `rank_resumes`.
+        
+        In map_reduce mode the batches are scored concurrently on the event loop;
+        the tool-driven agent mode runs in a worker thread.
         """
+        if self.ranking_mode != "map_reduce":
+            return await asyncio.to_thread(self.rank_resumes, job_description, skills, experience)
         
-        return self.agent.execute_task(prompt) 
\ No newline at end of file
+        shortlist = self.shortlist(f"{skills}\n{experience}\n{job_description}", skills)
+        scored, pending, batches = self._cached_scores(job_description, shortlist)
+        
+        # Map: one LLM call per batch, bounded by the connector's per-endpoint limit
+        batch_results = await asyncio.gather(*(
+            self._ascore_batch(job_description, batch) for batch in batches
+        ))
+        return self._merge_scores(scored, batches, batch_results, len(pending), len(shortlist), skills)
+    
+    def _rank_map_reduce(self, job_description: str, shortlist: List[str], skills: str = "") -> str:
+        """
+        Score resume batches in independent LLM calls and merge the scores in Python.
+        
+        Resumes whose score is already cached for this job description and model
+        are not sent to the LLM again.
+        
+        Args:
+            job_description: Job description to match against
+            shortlist: Paths of the resumes to score
+            skills: Comma-separated required skills, reported as coverage evidence
+            
+        Returns:
+            str: ranked list of candidates at or above `min_score`
+        """
+        scored, pending, batches = self._cached_scores(job_description, shortlist)
+        
+        # Map: one LLM call per batch, bounded by the worker pool; batches run in
+        # copies of the caller's context so their metrics count toward its run
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, self._score_batch, job_description, batch)
+                for batch in batches
+            ]
+            batch_results = [future.result() for future in futures]
+        
+        return self._merge_scores(scored, batches, batch_results, len(pending), len(shortlist), skills)
+    
+    def _cached_scores(self, job_description: str, shortlist: List[str]) -> Tuple[List[Dict[str, Any]], List[Tuple[str, str, str]], List[List[Tuple[str, str, str]]]]:
+        """
+        Split the shortlist into cached scores and batches that still need the LLM.
+        
+        Args:
+            job_description: Job description to match against
+            shortlist: Paths of the resumes to score
+            
+        Returns:
+            Tuple: cached score records, pending (path, resume text, cache key) entries, and the pending entries in batches
+        """
+        model = getattr(self.llm, "model", "")
+        temperature = getattr(self.llm, "temperature", None)
+        
+        scored = []
+        pending = []
+        for path in shortlist:
+            with open(path, "r", encoding="utf-8", errors="ignore") as file:
+                resume = file.read()
+            key = self.score_cache.make_key(job_description, resume, model, temperature, SCORE_PROMPT_VERSION)
+            cached = self.score_cache.get(key)
+            if cached:
+                scored.append(dict(cached, file=os.path.basename(path), path=path))
+            else:
+                pending.append((path, resume, key))
+        
+        batches = [
+            pending[i:i + self.batch_size]
+            for i in range(0, len(pending), self.batch_size)
+        ]
+        return scored, pending, batches
+    
+    def _merge_scores(self, scored: List[Dict[str, Any]], batches: List[List[Tuple[str, str, str]]],
+                      batch_results: List[List[Dict[str, Any]]], misses: int, total: int,
+                      skills: str = "") -> str:
+        """
+        Cache the new scores and reduce all scores into the final ranking.
+        
+        Args:
+            scored: Score records served from the cache
+            batches: Batches sent to the LLM
+            batch_results: Score records per batch
+            misses: Number of resumes that were not cached
+            total: Number of shortlisted resumes
+            skills: Comma-separated required skills, reported as coverage evidence
+            
+        Returns:
+            str: ranked list of candidates at or above `min_score`
+        """
+        for batch, results in zip(batches, batch_results):
+            for (_, _, key), result in zip(batch, results):
+                if result.pop("parsed"):
+                    self.score_cache.put(key, result)
+                scored.append(result)
+        
+        if skills:
+            for result in scored:
+                result.update(self.skill_matcher.evidence(result["path"], skills))
+        
+        # Reduce: deterministic order by score, then by file name for ties
+        scored.sort(key=lambda result: (-result["score"], result["file"]))
+        self.last_ranking = [result for result in scored if result["score"] >= self.min_score]
+        
+        summary = f"Score cache: {total - misses} hits, {misses} misses"
+        return f"{self._format_ranking(self.last_ranking, len(scored))}\n\n{summary}"
+    
+    def _score_batch(self, job_description: str, batch: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+        """
+        Score a small batch of resumes against the job description in one LLM call.
+        
+        Args:
+            job_description: Job description to match against
+            batch: (path, resume text, cache key) for each resume in this batch
+            
+        Returns:
+            List[Dict[str, Any]]: One score record per resume in the batch
+        """
+        messages, records = self._batch_messages(job_description, batch)
+        return self._batch_scores(self.llm.call(messages), batch, records)
+    
+    async def _ascore_batch(self, job_description: str, batch: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+        """Async variant of `_score_batch`."""
+        messages, records = self._batch_messages(job_description, batch)
+        return self._batch_scores(await self.llm.acall(messages), batch, records)
+    
+    def _batch_messages(self, job_description: str, batch: List[Tuple[str, str, str]]) -> Tuple[List[Dict[str, str]], List[Dict[str, Any]]]:
+        """Build the scoring messages for a batch, with the extracted record of each resume."""
+        # The compact extracted profile replaces the full resume text in the prompt
+        records = [self.resume_index.extractor.extract(resume) for _, resume, _ in batch]
+        resumes = [
+            f"FILE: {os.path.basename(path)}\n{format_profile(record)}"
+            for (path, _, _), record in zip(batch, records)
+        ]
+        
+        # The job description and instructions are identical for every batch, so
+        # they form the shared prefix and the profiles come last
+        shared = f"""
+        Score each candidate profile given after the job description against it.
+        
+        JOB DESCRIPTION:
+        {job_description}
+        
+        Respond with only a JSON array containing one object per resume with these keys:
+        "file" (the FILE name given with the profile), "score" (match score from 0-100),
+        "strengths" (key strengths relative to the job description),
+        "weaknesses" (missing qualifications or weaknesses) and "justification" (1-2 sentences).
+        """
+        prompt = f"""
+        CANDIDATE PROFILES:
+        {chr(10).join(resumes)}
+        """
+        
+        return agent_messages(self.config, prompt, shared), records
+    
+    def _batch_scores(self, response: Any, batch: List[Tuple[str, str, str]],
+                      records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Parse a batch response and take candidate names from the extracted records."""
+        results = self._parse_scores(str(response), [path for path, _, _ in batch])
+        for result, record in zip(results, records):
+            result["name"] = record.get("name") or result["name"]
+        return results
+    
+    def _parse_scores(self, response: str, batch: List[str]) -> List[Dict[str, Any]]:
+        """
+        Parse the JSON scores returned for a batch, defaulting unscored resumes to 0.
+        
+        Args:
+            response: Raw LLM response
+            batch: Paths of the resumes that were scored
+            
+        Returns:
+            List[Dict[str, Any]]: One score record per resume in the batch
+        """
+        records = []
+        match = re.search(r"\[.*\]", response, re.DOTALL)
+        if match:
+            try:
+                records = json.loads(match.group(0))
+            except json.JSONDecodeError:
+                records = []
+        
+        by_file = {
+            str(record.get("file", "")): record
+            for record in records if isinstance(record, dict)
+        }
+        
+        results = []
+        for position, path in enumerate(batch):
+            file_name = os.path.basename(path)
+            # Fall back to position when the model mangles the file name
+            record = by_file.get(file_name)
+            if record is None and position < len(records) and isinstance(records[position], dict):
+                record = records[position]
+            parsed = bool(record)
+            if not parsed:
+                record = {"justification": "The model did not return a parsable score."}
+            
+            try:
+                score = float(record.get("score", 0))
+            except (TypeError, ValueError):
+                score = 0.0
+            
+            results.append({
+                "file": file_name,
+                "path": path,
+                "name": record.get("name") or file_name,
+                "score": max(0.0, min(100.0, score)),
+                "strengths": self._as_text(record.get("strengths", "")),
+                "weaknesses": self._as_text(record.get("weaknesses", "")),
+                "justification": self._as_text(record.get("justification", "")),
+                "parsed": parsed
+            })
+        
+        return results
+    
+    def _as_text(self, value: Any) -> str:
+        """Join list answers (the model often returns bullet lists) into one line."""
+        if isinstance(value, list):
+            return "; ".join(str(item) for item in value)
+        return str(value)
+    
+    def _format_ranking(self, ranking: List[Dict[str, Any]], total: int) -> str:
+        """Render the merged ranking as a report."""
+        lines = [
+            f"Scored {total} resumes; {len(ranking)} candidates scored {self.min_score} or higher.",
+            ""
+        ]
+        for rank, result in enumerate(ranking, start=1):
+            lines.append(f"{rank}. {result['name']} ({result['file']}) - Match score: {result['score']:.0f}")
+            lines.append(f"   Strengths: {result['strengths']}")
+            lines.append(f"   Weaknesses: {result['weaknesses']}")
+            lines.append(f"   Justification: {result['justification']}")
+            if "coverage" in result:
+                lines.append(f"   Evidence: {self._format_evidence(result)}")
+        return "\n".join(lines)
\ No newline at end of file
@@ -1,6 +1,8 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from crewai import Agent, Task
 
+from src.utils.prompts import agent_messages, fit_sections, layered_prompt
+
 
 class SentimentAnalyzer:
     """
@@ -71,11 +73,26 @@ class SentimentAnalyzer:
         Returns:
             Dict[str, Any]: Sentiment analysis results
         """
-        prompt = f"""
-        Analyze the sentiment and emotional tone of this interview transcript.
-        
-        INTERVIEW TRANSCRIPT:
-        {interview_transcript}
+        sentiment_analysis = self.agent.execute_task(
+            layered_prompt(*self._sentiment_prompt(interview_transcript))
+        )
+        return self._sentiment_result(sentiment_analysis)
+    
+    async def aanalyze_sentiment(self, interview_transcript: str) -> Dict[str, Any]:
+        """Async variant of `analyze_sentiment`."""
+        shared, prompt = self._sentiment_prompt(interview_transcript)
+        sentiment_analysis = await self.llm.acall(agent_messages(self.config, prompt, shared))
+        return self._sentiment_result(sentiment_analysis)
+    
+    def _sentiment_prompt(self, interview_transcript: str) -> Tuple[str, str]:
+        """Build the prompt for a sentiment analysis as (shared, per-candidate) parts, within the token budget."""
+        interview_transcript, = fit_sections(self.llm, self.config, self._sentiment_layout, [interview_transcript])
+        return self._sentiment_layout(interview_transcript)
+    
+    def _sentiment_layout(self, interview_transcript: str) -> Tuple[str, str]:
+        """Lay out the sentiment prompt around the transcript."""
+        shared = """
+        Analyze the sentiment and emotional tone of the interview transcript given after these instructions.
         
         Please provide a detailed analysis that includes:
         
@@ -91,9 +108,14 @@ class SentimentAnalyzer:
         For each point, provide specific examples from the transcript that support your analysis.
         Structure your response with clear headings and bullet points where appropriate.
         """
-        
-        sentiment_analysis = self.agent.execute_task(prompt)
-        
+        prompt = f"""
+        INTERVIEW TRANSCRIPT:
+        {interview_transcript}
+        """
+        return shared, prompt
+    
+    def _sentiment_result(self, sentiment_analysis: str) -> Dict[str, Any]:
+        """Package the analysis text with its sentiment scores."""
         # For a real application, we would parse this into a structured format
         # For simplicity, we'll return it as is with a mock sentiment score
         sentiment_score = self._extract_sentiment_score(sentiment_analysis)
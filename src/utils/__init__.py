@@ -1,11 +1,43 @@
 from src.utils.config_loader import ConfigLoader
+from src.utils.templates import TaskTemplate
 from src.utils.model_connector import ModelConnector
 from src.utils.agent_factory import AgentFactory
 from src.utils.workflow_engine import WorkflowEngine
+from src.utils.resume_index import ResumeIndex
+from src.utils.score_cache import ScoreCache
+from src.utils.resume_extractor import ResumeExtractor
+from src.utils.skill_matcher import SkillMatcher
+from src.utils.dedup import DuplicateIndex
+from src.utils.embedding_index import EmbeddingIndex
+from src.utils.response_cache import ResponseCache
+from src.utils.single_flight import SingleFlight
+from src.utils.endpoint_pool import EndpointPool
+from src.utils.admission import AdmissionController, AdmissionRejected
+from src.utils.token_budget import TokenBudget
+from src.utils.run_store import RunStore
+from src.utils.requisition_store import RequisitionStore
+from src.utils.metrics import RunMetrics, run_metrics
 
 __all__ = [
     'ConfigLoader',
+    'TaskTemplate',
     'ModelConnector',
     'AgentFactory',
-    'WorkflowEngine'
+    'WorkflowEngine',
+    'ResumeIndex',
+    'ScoreCache',
+    'ResumeExtractor',
+    'SkillMatcher',
+    'DuplicateIndex',
+    'EmbeddingIndex',
+    'ResponseCache',
+    'SingleFlight',
+    'EndpointPool',
+    'AdmissionController',
+    'AdmissionRejected',
+    'TokenBudget',
+    'RunStore',
+    'RequisitionStore',
+    'RunMetrics',
+    'run_metrics'
 ] 
\ No newline at end of file
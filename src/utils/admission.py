@@ -0,0 +1,196 @@
+import asyncio
+import collections
+import threading
+import time
+from typing import Callable, Optional
+
+from src.utils.metrics import run_metrics
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised when an endpoint is saturated and a request is not admitted."""
+
+
+class AdmissionController:
+    """
+    Adaptive concurrency limit for one Ollama endpoint.
+
+    The limit grows additively while requests succeed at normal latency and is
+    cut multiplicatively on errors or when latency per generated token exceeds
+    `latency_tolerance` times its moving baseline (AIMD). Requests over the
+    limit wait in a bounded FIFO queue; they are rejected when the queue is
+    full, after `queue_timeout` seconds, or immediately under the "reject" policy.
+    """
+
+    def __init__(self, initial_limit: int = 4, min_limit: int = 1, max_limit: int = 16,
+                 queue_size: int = 64, policy: str = "wait", queue_timeout: Optional[float] = 120,
+                 latency_tolerance: float = 2.0, target_latency: Optional[float] = None,
+                 backoff: float = 0.5):
+        """
+        Initialize the controller.
+
+        Args:
+            initial_limit: Concurrent requests allowed before any latency is observed
+            min_limit: Lowest the limit is ever cut to
+            max_limit: Highest the limit can grow to
+            queue_size: Maximum number of requests waiting for admission
+            policy: "wait" to queue requests over the limit, "reject" to fail them immediately
+            queue_timeout: Seconds a queued request waits before it is rejected (None waits forever)
+            latency_tolerance: Latency per token above this multiple of the baseline counts as overload
+            target_latency: Fixed seconds per generated token above which requests count
+                as overload, instead of the moving baseline
+            backoff: Factor applied to the limit on overload
+        """
+        if policy not in ("wait", "reject"):
+            raise ValueError(f"Unknown admission policy: {policy}")
+        self.limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.queue_size = queue_size if policy == "wait" else 0
+        self.queue_timeout = queue_timeout
+        self.latency_tolerance = latency_tolerance
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.in_flight = 0
+        self.baseline = None
+        self._last_decrease = 0.0
+        self._waiters = collections.deque()
+        self._lock = threading.Lock()
+
+    def _admit_now(self) -> bool:
+        """Take a slot if one is free and nobody is queued ahead (lock held)."""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return True
+        if len(self._waiters) >= self.queue_size:
+            run_metrics.increment("llm_admission_rejected")
+            raise AdmissionRejected(
+                f"Endpoint saturated: {self.in_flight} in flight (limit {int(self.limit)}), "
+                f"{len(self._waiters)} queued"
+            )
+        run_metrics.increment("llm_admission_queued")
+        return False
+
+    def _dispatch(self) -> None:
+        """Hand free slots to queued requests in arrival order (lock held)."""
+        while self._waiters and self.in_flight < int(self.limit):
+            grant = self._waiters.popleft()
+            self.in_flight += 1
+            grant()
+
+    def _withdraw(self, grant: Callable[[], None]) -> bool:
+        """Remove a waiter that gave up; False if it was already granted a slot."""
+        with self._lock:
+            try:
+                self._waiters.remove(grant)
+                return True
+            except ValueError:
+                return False
+
+    def acquire(self) -> float:
+        """
+        Wait for admission from a thread.
+
+        Returns:
+            float: Admission time, to pass back to `release`
+
+        Raises:
+            AdmissionRejected: If the request is not admitted
+        """
+        with self._lock:
+            if self._admit_now():
+                return time.monotonic()
+            granted = threading.Event()
+            self._waiters.append(granted.set)
+
+        if not granted.wait(self.queue_timeout) and self._withdraw(granted.set):
+            run_metrics.increment("llm_admission_rejected")
+            raise AdmissionRejected(f"No admission within {self.queue_timeout}s")
+        return time.monotonic()
+
+    async def aacquire(self) -> float:
+        """
+        Wait for admission from a coroutine without blocking the event loop.
+
+        Returns:
+            float: Admission time, to pass back to `release`
+
+        Raises:
+            AdmissionRejected: If the request is not admitted
+        """
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def deliver() -> None:
+            # Runs on the waiter's loop; a slot granted to a waiter that gave up is returned
+            if granted.done():
+                self._return_slot()
+            else:
+                granted.set_result(None)
+
+        def grant() -> None:
+            loop.call_soon_threadsafe(deliver)
+
+        with self._lock:
+            if self._admit_now():
+                return time.monotonic()
+            self._waiters.append(grant)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(granted), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if self._withdraw(grant):
+                run_metrics.increment("llm_admission_rejected")
+                raise AdmissionRejected(f"No admission within {self.queue_timeout}s")
+            await granted
+        except asyncio.CancelledError:
+            if not self._withdraw(grant) and granted.done():
+                self._return_slot()
+            granted.cancel()
+            raise
+        return time.monotonic()
+
+    def _return_slot(self) -> None:
+        """Give back a slot without recording an outcome."""
+        with self._lock:
+            self.in_flight -= 1
+            self._dispatch()
+
+    def release(self, admitted_at: float, ok: Optional[bool], latency: Optional[float] = None) -> None:
+        """
+        Return a slot and adapt the limit to the request's outcome.
+
+        Args:
+            admitted_at: Value returned by `acquire`
+            ok: Whether the request succeeded; None if it was abandoned
+            latency: Generation seconds per generated token, as measured by the server. Prompt
+                evaluation is left out, so long prompts do not look like overload; None
+                records no latency sample
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.in_flight -= 1
+            if ok is not None:
+                self._adapt(ok, latency, admitted_at, now)
+            self._dispatch()
+
+    def _adapt(self, ok: bool, latency: Optional[float], admitted_at: float, now: float) -> None:
+        """Apply the AIMD update (lock held)."""
+        threshold = self.target_latency
+        if threshold is None and self.baseline is not None:
+            threshold = self.baseline * self.latency_tolerance
+        overloaded = not ok or (latency is not None and threshold is not None and latency > threshold)
+
+        if overloaded:
+            # Requests admitted before the last cut already saw the old limit; cut once per episode
+            if admitted_at >= self._last_decrease:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+                run_metrics.increment("llm_admission_backoffs")
+            return
+
+        if latency is None:
+            return
+        self.baseline = latency if self.baseline is None else 0.9 * self.baseline + 0.1 * latency
+        # About one extra slot per limit's worth of successful requests
+        self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
@@ -1,15 +1,6 @@
+import json
 from typing import Dict, Any, Optional
 
-from src.agents import (
-    JobDescriptionGenerator,
-    ResumeRanker,
-    EmailAutomation,
-    InterviewScheduler,
-    InterviewAgent,
-    HireRecommendation,
-    SentimentAnalyzer
-)
-
 
 class AgentFactory:
     """Factory for creating agent instances from configuration."""
@@ -25,29 +16,115 @@ class AgentFactory:
         self.config_loader = config_loader
         self.model_connector = model_connector
         self.llm = model_connector.get_model()
+        self.llm_handles = {}
         self.agent_instances = {}
     
-    def get_agent(self, agent_id: str):
+    def get_llm(self, overrides: Optional[Dict[str, Any]] = None, use_cache: bool = True):
+        """
+        Get or create the LLM handle for a model configuration.
+        
+        Args:
+            overrides: Settings that differ from the `model:` section (name, base_url, temperature,
+                max_tokens, context_window)
+            use_cache: False gives a handle whose calls bypass the response cache
+            
+        Returns:
+            LLM handle, shared by every agent with the same model configuration
+        """
+        key = self._llm_key(overrides, use_cache)
+        if key not in self.llm_handles:
+            self.llm_handles[key] = self.model_connector.create_model(overrides, use_cache)
+        return self.llm_handles[key]
+    
+    def get_agent(self, agent_id: str, use_cache: bool = True, model: Any = None):
         """
         Get or create an agent instance by ID.
         
         Args:
             agent_id: ID of the agent to create/retrieve
+            use_cache: False gives an agent whose LLM calls bypass the response cache
+            model: Task-level model override, applied on top of the agent's own `model:`
             
         Returns:
             Agent instance
         """
-        if agent_id in self.agent_instances:
-            return self.agent_instances[agent_id]
+        agent_config, overrides = self._agent_settings(agent_id, model)
+        instance_key = (agent_id, self._llm_key(overrides, use_cache))
+        if instance_key in self.agent_instances:
+            return self.agent_instances[instance_key]
         
+        llm = self.get_llm(overrides, use_cache)
+        agent_instance = self._create_agent_instance(agent_id, agent_config, llm)
+        self.agent_instances[instance_key] = agent_instance
+        
+        return agent_instance
+    
+    def _agent_settings(self, agent_id: str, model: Any = None):
+        """Get an agent's configuration and the model overrides of the agent and task combined."""
         agent_config = self.config_loader.get_agent_config(agent_id)
         if not agent_config:
             raise ValueError(f"No configuration found for agent ID: {agent_id}")
         
-        agent_instance = self._create_agent_instance(agent_id, agent_config)
-        self.agent_instances[agent_id] = agent_instance
+        agent_model = self._model_overrides(agent_config.get("model"))
+        if "max_tokens" in agent_config:
+            agent_model["max_tokens"] = agent_config["max_tokens"]
+        return agent_config, {**agent_model, **self._model_overrides(model)}
+    
+    def _task_model(self, task_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Model overrides a task sets through `model` and `max_tokens`."""
+        model = self._model_overrides(task_config.get("model"))
+        if "max_tokens" in task_config:
+            # Output budget of this task, so short tasks do not reserve the global max_tokens
+            model["max_tokens"] = task_config["max_tokens"]
+        return model
+    
+    def new_agent_for_task(self, task_config: Dict[str, Any]):
+        """
+        Create a separate agent instance for a task, e.g. for one of several candidates
+        processed in parallel, since an agent instance runs one execution at a time.
         
-        return agent_instance
+        The instance shares the LLM handle of the cached agents with the same settings.
+        
+        Args:
+            task_config: Task configuration
+            
+        Returns:
+            Agent instance
+        """
+        agent_id = task_config.get("agent")
+        if not agent_id:
+            raise ValueError("No agent specified for task")
+        use_cache = task_config.get("cache", True)
+        agent_config, overrides = self._agent_settings(agent_id, self._task_model(task_config))
+        return self._create_agent_instance(agent_id, agent_config, self.get_llm(overrides, use_cache))
+    
+    def get_agent_for_task(self, task_config: Dict[str, Any]):
+        """
+        Get the agent instance that runs a task, honoring the task's `cache`, `model`
+        and `max_tokens` settings.
+        
+        Args:
+            task_config: Task configuration
+            
+        Returns:
+            Agent instance
+        """
+        agent_id = task_config.get("agent")
+        if not agent_id:
+            raise ValueError("No agent specified for task")
+        return self.get_agent(agent_id, task_config.get("cache", True), self._task_model(task_config))
+    
+    def _model_overrides(self, model: Any) -> Dict[str, Any]:
+        """Normalize a `model:` override given as a model name or a settings mapping."""
+        if not model:
+            return {}
+        if isinstance(model, str):
+            return {"name": model}
+        return dict(model)
+    
+    def _llm_key(self, overrides: Optional[Dict[str, Any]], use_cache: bool) -> str:
+        """Identity of a model configuration, used to share LLM handles and agents."""
+        return json.dumps([overrides or {}, use_cache], sort_keys=True)
     
     def create_task(self, task_id: str):
         """
@@ -63,24 +140,35 @@ class AgentFactory:
         if not task_config:
             raise ValueError(f"No configuration found for task ID: {task_id}")
         
-        agent_id = task_config.get("agent")
-        if not agent_id:
+        if not task_config.get("agent"):
             raise ValueError(f"No agent specified for task ID: {task_id}")
         
-        agent_instance = self.get_agent(agent_id)
+        agent_instance = self.get_agent_for_task(task_config)
         return agent_instance.create_task(task_config)
     
-    def _create_agent_instance(self, agent_id: str, agent_config: Dict[str, Any]):
+    def _create_agent_instance(self, agent_id: str, agent_config: Dict[str, Any], llm: Any):
         """
         Create an agent instance based on agent ID and configuration.
         
         Args:
             agent_id: ID of the agent
             agent_config: Agent configuration
+            llm: LLM handle the agent runs on
             
         Returns:
             Agent instance
         """
+        # Imported here because the agents themselves import src.utils modules
+        from src.agents import (
+            JobDescriptionGenerator,
+            ResumeRanker,
+            EmailAutomation,
+            InterviewScheduler,
+            InterviewAgent,
+            HireRecommendation,
+            SentimentAnalyzer
+        )
+        
         agent_map = {
             "job_description_generator": JobDescriptionGenerator,
             "resume_ranker": ResumeRanker,
@@ -95,4 +183,8 @@ class AgentFactory:
         if not agent_class:
             raise ValueError(f"Unknown agent type for ID: {agent_id}")
         
-        return agent_class(agent_config, self.llm) 
\ No newline at end of file
+        if agent_class is ResumeRanker:
+            # Semantic retrieval embeds resumes through the connector
+            return agent_class(agent_config, llm, self.model_connector)
+        
+        return agent_class(agent_config, llm) 
\ No newline at end of file
@@ -0,0 +1,180 @@
+import csv
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterator, Optional
+
+from src.utils.agent_factory import AgentFactory
+from src.utils.config_loader import ConfigLoader
+from src.utils.model_connector import ModelConnector
+from src.utils.workflow_engine import WorkflowEngine
+
+# Workflow engine of the current worker process, built once by `_init_worker`
+_engine = None
+
+
+def read_requisitions(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream requisition contexts from a JSONL or CSV file.
+
+    Args:
+        path: File with one requisition per line (JSONL) or row (CSV with a header)
+
+    Yields:
+        Dict[str, Any]: Context of one requisition, e.g. job_title, skills and experience
+    """
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        if path.lower().endswith(".csv"):
+            for row in csv.DictReader(file):
+                yield {key: value for key, value in row.items() if key and value not in (None, "")}
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _init_worker(config_dir: str) -> None:
+    """Build the configuration, model connector and workflow engine of a worker process once."""
+    global _engine
+    config_loader = ConfigLoader(config_dir)
+    model_connector = ModelConnector(config_loader.get_model_config())
+    # Spawned workers have no usable stdin, so tasks run without their human review
+    _engine = WorkflowEngine(config_loader, AgentFactory(config_loader, model_connector), human_input=False)
+
+
+def _run_item(index: int, workflow_id: str, context: Dict[str, Any], regenerate: bool) -> Dict[str, Any]:
+    """Run one requisition in a worker, turning any failure into a failed result."""
+    started = time.perf_counter()
+    try:
+        results = _engine.run_workflow(workflow_id, context, regenerate=regenerate)
+        return {
+            "index": index,
+            "status": "completed",
+            "workflow": workflow_id,
+            "context": context,
+            "run_id": results.get("run_id"),
+            "results": results.get("workflow_results"),
+            "metrics": results.get("metrics"),
+            "duration": time.perf_counter() - started
+        }
+    except Exception as error:
+        return {
+            "index": index,
+            "status": "failed",
+            "workflow": workflow_id,
+            "context": context,
+            "run_id": getattr(error, "run_id", None),
+            "error": f"{type(error).__name__}: {error}",
+            "duration": time.perf_counter() - started
+        }
+
+
+def run_batch(input_path: str, output_path: str, workflow_id: str, defaults: Optional[Dict[str, Any]] = None,
+              workers: int = 2, regenerate: bool = False, config_dir: str = "config") -> Dict[str, Any]:
+    """
+    Run a workflow for every requisition in a file across a pool of worker processes.
+
+    Requisitions are read as a stream and at most two per worker are queued at a
+    time. Each result is appended to the output JSONL as soon as it is done, in
+    completion order. A requisition may set its own `workflow`. Tasks marked
+    `human_input_required` run without their review prompt, and their output
+    is not stored as an approved job description. A failing
+    requisition is recorded with its error (and run ID, for `--resume`) and
+    does not stop the batch; if a worker process dies, the requisitions in
+    flight are recorded as failed and a fresh pool takes over.
+
+    Args:
+        input_path: JSONL or CSV file of requisitions
+        output_path: JSONL file the results are appended to
+        workflow_id: Workflow run for requisitions that do not name one
+        defaults: Context values used where a requisition leaves them out
+        workers: Number of worker processes
+        regenerate: Regenerate job descriptions even if one was approved for a requisition
+        config_dir: Configuration directory the workers load
+
+    Returns:
+        Dict[str, Any]: Throughput summary
+    """
+    defaults = defaults or {}
+    workers = max(1, workers)
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+
+    def new_pool() -> ProcessPoolExecutor:
+        # Spawned rather than forked: the parent may already hold pooled connections and probe threads
+        return ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker, initargs=(config_dir,)
+        )
+
+    started = time.perf_counter()
+    counts = {"completed": 0, "failed": 0}
+    busy_seconds = 0.0
+    metrics = {}
+    requisitions = enumerate(read_requisitions(input_path))
+    running = {}
+    exhausted = False
+    executor = new_pool()
+
+    try:
+        with open(output_path, "a", encoding="utf-8") as output:
+            while running or not exhausted:
+                while not exhausted and len(running) < workers * 2:
+                    try:
+                        index, requisition = next(requisitions)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    context = {**defaults, **requisition}
+                    item_workflow = context.pop("workflow", workflow_id)
+                    future = executor.submit(_run_item, index, item_workflow, context, regenerate)
+                    running[future] = (index, item_workflow, context)
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    index, item_workflow, context = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as error:
+                        # A worker process died (e.g. out of memory), which breaks the whole pool
+                        broken = broken or isinstance(error, BrokenProcessPool)
+                        result = {
+                            "index": index,
+                            "status": "failed",
+                            "workflow": item_workflow,
+                            "context": context,
+                            "error": f"{type(error).__name__}: {error}"
+                        }
+                    counts[result["status"]] += 1
+                    busy_seconds += result.get("duration", 0.0)
+                    for name, value in (result.get("metrics") or {}).items():
+                        metrics[name] = metrics.get(name, 0) + value
+                    output.write(json.dumps(result, default=str) + "\n")
+                    output.flush()
+                    print(f"[batch] requisition {index} {result['status']} "
+                          f"({counts['completed'] + counts['failed']} done)")
+                if broken:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor = new_pool()
+    finally:
+        executor.shutdown()
+
+    elapsed = time.perf_counter() - started
+    total = counts["completed"] + counts["failed"]
+    return {
+        "requisitions": total,
+        "completed": counts["completed"],
+        "failed": counts["failed"],
+        "workers": workers,
+        "elapsed_seconds": elapsed,
+        "requisitions_per_minute": total / elapsed * 60 if elapsed else 0.0,
+        "mean_seconds_per_requisition": busy_seconds / total if total else 0.0,
+        "metrics": metrics,
+        "output": output_path
+    }
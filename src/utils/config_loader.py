@@ -2,6 +2,8 @@ import yaml
 import os
 from typing import Dict, Any, List, Optional
 
+from src.utils.templates import TaskTemplate
+
 
 class ConfigLoader:
     """Utility class to load and manage YAML configurations."""
@@ -11,12 +13,39 @@ class ConfigLoader:
         self.config_dir = config_dir
         self.agents_config = None
         self.workflows_config = None
+        self.task_templates = {}
         self._load_configs()
     
     def _load_configs(self) -> None:
         """Load all configuration files."""
         self.agents_config = self._load_yaml(os.path.join(self.config_dir, "agents.yaml"))
         self.workflows_config = self._load_yaml(os.path.join(self.config_dir, "workflows.yaml"))
+        self._compile_templates()
+    
+    def _compile_templates(self) -> None:
+        """
+        Compile every task description into a template and check each workflow's placeholders.
+        
+        Raises:
+            ValueError: If a description has a malformed placeholder, or uses a
+                placeholder that is not among the `inputs` its workflow declares
+        """
+        self.task_templates = {
+            task_id: TaskTemplate(task_config.get("description", ""), task_id)
+            for task_id, task_config in self.get_all_tasks().items()
+        }
+        for workflow_id, workflow in self.get_all_workflows().items():
+            if "inputs" not in workflow:
+                continue
+            inputs = set(workflow.get("inputs") or [])
+            for task_id in workflow.get("tasks", []):
+                template = self.task_templates.get(task_id)
+                undeclared = [key for key in (template.placeholders if template else []) if key not in inputs]
+                if undeclared:
+                    raise ValueError(
+                        f"Task {task_id} in workflow {workflow_id} uses placeholders "
+                        f"not among the workflow inputs: {', '.join(undeclared)}"
+                    )
     
     def _load_yaml(self, file_path: str) -> Dict[str, Any]:
         """Load a YAML file into a dictionary."""
@@ -46,6 +75,10 @@ class ConfigLoader:
         """Get all task configurations."""
         return self.agents_config.get("tasks", {})
     
+    def get_task_template(self, task_id: str) -> Optional[TaskTemplate]:
+        """Get the compiled description template of a task."""
+        return self.task_templates.get(task_id)
+    
     def get_workflow(self, workflow_id: str) -> Optional[Dict[str, Any]]:
         """Get configuration for a specific workflow."""
         return self.workflows_config.get("workflows", {}).get(workflow_id)
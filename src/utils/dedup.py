@@ -0,0 +1,219 @@
+import os
+import re
+import sqlite3
+import zlib
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+WORD_PATTERN = re.compile(r"\w+")
+
+
+class MinHasher:
+    """Computes MinHash signatures over word shingles."""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        """
+        Initialize the hasher.
+
+        Args:
+            num_perm: Number of hash permutations (signature length)
+            shingle_size: Number of consecutive words per shingle
+            seed: Seed for the permutation parameters, fixed so signatures are stable across runs
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        generator = np.random.RandomState(seed)
+        self.a = generator.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.b = generator.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        Compute the MinHash signature of a text.
+
+        Args:
+            text: Raw text
+
+        Returns:
+            np.ndarray: uint32 signature of length `num_perm`
+        """
+        words = WORD_PATTERN.findall(text.lower())
+        shingles = {
+            " ".join(words[i:i + self.shingle_size])
+            for i in range(max(1, len(words) - self.shingle_size + 1))
+        }
+        hashes = np.array([zlib.crc32(shingle.encode("utf-8")) for shingle in shingles], dtype=np.uint64)
+
+        # Universal hashing (a * x + b) mod p, one row per permutation
+        permuted = (np.outer(self.a, hashes) + self.b[:, None]) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=1).astype(np.uint32)
+
+
+class DuplicateIndex:
+    """
+    Persistent MinHash LSH index that groups near-duplicate resumes into clusters.
+
+    Signatures are split into bands; resumes sharing a band bucket are candidate
+    duplicates, confirmed by their estimated Jaccard similarity. Inserts only look
+    up their own buckets, so they stay sub-linear in the size of the store.
+    """
+
+    def __init__(self, index_path: str = "./data/index/duplicates.db", num_perm: int = 128,
+                 bands: int = 16, threshold: float = 0.8):
+        """
+        Initialize the duplicate index.
+
+        Args:
+            index_path: SQLite file holding signatures and band buckets
+            num_perm: MinHash signature length
+            bands: Number of LSH bands (num_perm must be divisible by it)
+            threshold: Estimated Jaccard similarity at which two resumes are duplicates
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.index_path = index_path
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS signatures (
+                    file_name TEXT PRIMARY KEY,
+                    signature BLOB NOT NULL,
+                    cluster TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS signatures_cluster ON signatures (cluster)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (band INTEGER, bucket TEXT, file_name TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS buckets_lookup ON buckets (band, bucket)")
+            conn.execute("CREATE INDEX IF NOT EXISTS buckets_file ON buckets (file_name)")
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection to the index file, committing on success."""
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _band_keys(self, signature: np.ndarray) -> List[str]:
+        """Hash each band of a signature into a bucket key."""
+        return [
+            signature[band * self.rows:(band + 1) * self.rows].tobytes().hex()
+            for band in range(self.bands)
+        ]
+
+    def _remove(self, conn: sqlite3.Connection, file_name: str) -> None:
+        """Delete a resume and promote a new representative if it led a cluster."""
+        conn.execute("DELETE FROM signatures WHERE file_name = ?", (file_name,))
+        conn.execute("DELETE FROM buckets WHERE file_name = ?", (file_name,))
+        successor = conn.execute(
+            "SELECT MIN(file_name) FROM signatures WHERE cluster = ?", (file_name,)
+        ).fetchone()[0]
+        if successor:
+            conn.execute("UPDATE signatures SET cluster = ? WHERE cluster = ?", (successor, file_name))
+
+    def add(self, file_name: str, text: str) -> List[str]:
+        """
+        Insert or refresh a resume and attach it to a cluster of near-duplicates.
+
+        Args:
+            file_name: Resume file name
+            text: Resume text
+
+        Returns:
+            List[str]: Other resumes in the same cluster
+        """
+        signature = self.hasher.signature(text)
+        band_keys = self._band_keys(signature)
+
+        with self._connect() as conn:
+            self._remove(conn, file_name)
+
+            candidates = set()
+            for band, key in enumerate(band_keys):
+                candidates.update(
+                    row[0] for row in conn.execute(
+                        "SELECT file_name FROM buckets WHERE band = ? AND bucket = ?", (band, key)
+                    )
+                )
+
+            cluster = file_name
+            best = self.threshold
+            for candidate in sorted(candidates):
+                row = conn.execute(
+                    "SELECT signature, cluster FROM signatures WHERE file_name = ?", (candidate,)
+                ).fetchone()
+                similarity = float(np.mean(np.frombuffer(row[0], dtype=np.uint32) == signature))
+                if similarity >= best:
+                    best = similarity
+                    cluster = row[1]
+
+            conn.execute(
+                "INSERT INTO signatures VALUES (?, ?, ?)", (file_name, signature.tobytes(), cluster)
+            )
+            conn.executemany(
+                "INSERT INTO buckets VALUES (?, ?, ?)",
+                [(band, key, file_name) for band, key in enumerate(band_keys)]
+            )
+
+        return self.duplicates_of(file_name)
+
+    def remove(self, file_name: str) -> None:
+        """
+        Drop a deleted resume from the index.
+
+        Args:
+            file_name: Resume file name
+        """
+        with self._connect() as conn:
+            self._remove(conn, file_name)
+
+    def duplicates_of(self, file_name: str) -> List[str]:
+        """
+        List the other resumes in a resume's cluster.
+
+        Args:
+            file_name: Resume file name
+
+        Returns:
+            List[str]: Near-duplicate file names
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT file_name FROM signatures WHERE cluster = "
+                "(SELECT cluster FROM signatures WHERE file_name = ?) AND file_name != ? "
+                "ORDER BY file_name",
+                (file_name, file_name)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def representative(self, file_name: str) -> Optional[str]:
+        """Get the representative resume of a resume's cluster."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT cluster FROM signatures WHERE file_name = ?", (file_name,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def clusters(self) -> Dict[str, str]:
+        """
+        Map every indexed resume to its cluster representative.
+
+        Returns:
+            Dict[str, str]: file name -> representative file name
+        """
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT file_name, cluster FROM signatures"))
@@ -0,0 +1,228 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import List, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows; appends are then only serialized within a process
+    fcntl = None
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+
+
+class EmbeddingIndex:
+    """
+    Resume embeddings stored in a memory-mapped float32 file keyed by content hash.
+
+    Vectors are L2-normalized on insert so cosine similarity is a dot product.
+    Small stores are searched exactly; above `exact_limit` vectors an inverted
+    file (k-means lists, `nprobe` probed per query) keeps search sub-linear.
+
+    keys.json records which rows of vectors.f32 are valid and is written last,
+    under a file lock, so a crash or a concurrent writer in another process
+    never misaligns vectors and keys.
+    """
+
+    def __init__(self, model_connector, index_dir: str = "./data/index/embeddings",
+                 exact_limit: int = 20000, nprobe: int = 8, batch_size: int = 32,
+                 max_chars: int = 8000):
+        """
+        Initialize the embedding index.
+
+        Args:
+            model_connector: ModelConnector used to compute embeddings
+            index_dir: Directory holding vectors.f32 and keys.json
+            exact_limit: Largest store searched exactly before switching to the inverted file
+            nprobe: Number of inverted lists scanned per query
+            batch_size: Number of texts per embeddings request
+            max_chars: Texts are truncated to this length before embedding
+        """
+        self.model_connector = model_connector
+        self.index_dir = index_dir
+        self.exact_limit = exact_limit
+        self.nprobe = nprobe
+        self.batch_size = batch_size
+        self.max_chars = max_chars
+        self.vectors_path = os.path.join(index_dir, "vectors.f32")
+        self.keys_path = os.path.join(index_dir, "keys.json")
+        self.lock_path = os.path.join(index_dir, "index.lock")
+        self.model = model_connector.embedding_model
+        self.dim = None
+        self.keys = []
+        self.rows = {}
+        self.vectors = None
+        self._ivf = None
+        self._lock = threading.Lock()
+        os.makedirs(index_dir, exist_ok=True)
+        self._load()
+
+    @contextmanager
+    def _file_lock(self):
+        """Hold an exclusive lock on the index files across processes."""
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _load(self) -> None:
+        """Open the key map and memory-map the stored vectors."""
+        self.dim = None
+        self.keys = []
+        self.rows = {}
+        self.vectors = None
+        self._ivf = None
+        if not os.path.exists(self.keys_path):
+            return
+        with open(self.keys_path, "r", encoding="utf-8") as file:
+            meta = json.load(file)
+        if meta.get("model") != self.model:
+            # Vectors from another embedding model are not comparable; start over
+            return
+
+        self.dim = meta["dim"]
+        # Keys without a complete vector row (e.g. the file was lost) are dropped
+        row_bytes = self.dim * np.dtype(np.float32).itemsize
+        stored_rows = os.path.getsize(self.vectors_path) // row_bytes if os.path.exists(self.vectors_path) else 0
+        self.keys = meta["keys"][:stored_rows]
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+        if self.keys:
+            self.vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r",
+                                     shape=(len(self.keys), self.dim))
+
+    def _append(self, keys: List[str], vectors: np.ndarray) -> None:
+        """
+        Append vectors to the file and remap it.
+
+        Rows beyond the recorded keys, left by an append that crashed before
+        writing keys.json, are cut off first, and the vectors are flushed to
+        disk before keys.json records them.
+        """
+        with self._file_lock():
+            # Another process may have appended since this one loaded the index
+            self._load()
+            new = [(key, vector) for key, vector in zip(keys, vectors) if key not in self.rows]
+            if not new:
+                return
+            if self.dim is None:
+                # A fresh index (or a model change) replaces whatever was on disk
+                self.dim = vectors.shape[1]
+
+            with open(self.vectors_path, "ab") as file:
+                file.truncate(len(self.keys) * self.dim * np.dtype(np.float32).itemsize)
+                file.write(np.asarray([vector for _, vector in new], dtype=np.float32).tobytes())
+                file.flush()
+                os.fsync(file.fileno())
+
+            self.keys.extend(key for key, _ in new)
+            self.rows = {key: row for row, key in enumerate(self.keys)}
+            temp_path = f"{self.keys_path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump({"model": self.model, "dim": self.dim, "keys": self.keys}, file)
+            os.replace(temp_path, self.keys_path)
+
+            self.vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r",
+                                     shape=(len(self.keys), self.dim))
+            self._ivf = None
+
+    def update(self, documents: List[Tuple[str, str]]) -> int:
+        """
+        Embed any documents whose content hash is not stored yet.
+
+        Args:
+            documents: (content hash, text) pairs
+
+        Returns:
+            int: Number of newly embedded documents
+        """
+        with self._lock:
+            missing = []
+            seen = set()
+            for key, text in documents:
+                if key not in self.rows and key not in seen:
+                    seen.add(key)
+                    missing.append((key, text))
+
+            for start in range(0, len(missing), self.batch_size):
+                batch = missing[start:start + self.batch_size]
+                vectors = self._normalize(np.asarray(
+                    self.model_connector.embed([text[:self.max_chars] for _, text in batch]),
+                    dtype=np.float32
+                ))
+                self._append([key for key, _ in batch], vectors)
+
+            return len(missing)
+
+    def _normalize(self, vectors: np.ndarray) -> np.ndarray:
+        """Scale vectors to unit length."""
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def _build_ivf(self) -> None:
+        """Cluster the stored vectors into inverted lists."""
+        n_lists = max(1, int(np.sqrt(len(self.keys))))
+        kmeans = MiniBatchKMeans(n_clusters=n_lists, random_state=0, n_init=3,
+                                 batch_size=min(len(self.keys), 4096))
+        assignments = kmeans.fit_predict(self.vectors)
+        lists = [np.flatnonzero(assignments == i) for i in range(n_lists)]
+        self._ivf = (self._normalize(kmeans.cluster_centers_.astype(np.float32)), lists)
+
+    def scores(self, query: str, keys: List[str]) -> np.ndarray:
+        """
+        Cosine similarity between a query and the documents with the given hashes.
+
+        Args:
+            query: Query text (e.g. a job description)
+            keys: Content hashes to score
+
+        Returns:
+            np.ndarray: Similarity per key; -1 for keys not embedded or not probed
+        """
+        result = np.full(len(keys), -1.0, dtype=np.float32)
+        if self.vectors is None or not keys:
+            return result
+
+        query_vector = self._normalize(np.asarray(
+            self.model_connector.embed([query[:self.max_chars]]), dtype=np.float32
+        ))[0]
+
+        with self._lock:
+            if len(self.keys) <= self.exact_limit:
+                similarities = self.vectors @ query_vector
+            else:
+                if self._ivf is None:
+                    self._build_ivf()
+                centroids, lists = self._ivf
+                nearest = np.argsort(-(centroids @ query_vector))[:self.nprobe]
+                probed = np.concatenate([lists[i] for i in nearest])
+                similarities = np.full(len(self.keys), -1.0, dtype=np.float32)
+                similarities[probed] = self.vectors[probed] @ query_vector
+
+        for i, key in enumerate(keys):
+            row = self.rows.get(key)
+            if row is not None:
+                result[i] = similarities[row]
+        return result
+
+    def search(self, query: str, keys: List[str], top_k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Top-K cosine search over the documents with the given hashes.
+
+        Args:
+            query: Query text
+            keys: Content hashes to search
+            top_k: Maximum number of results
+
+        Returns:
+            List[Tuple[str, float]]: (content hash, similarity), best match first
+        """
+        similarities = self.scores(query, keys)
+        ranked = np.argsort(-similarities, kind="stable")[:top_k]
+        return [(keys[i], float(similarities[i])) for i in ranked if similarities[i] > -1]
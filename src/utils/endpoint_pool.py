@@ -0,0 +1,147 @@
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+class Endpoint:
+    """One Ollama server and its routing state."""
+
+    def __init__(self, url: str):
+        """
+        Initialize the endpoint.
+
+        Args:
+            url: Base URL of the server, e.g. http://gpu-1:11434
+        """
+        self.url = url.rstrip("/")
+        self.outstanding = 0
+        self.served = 0
+        self.failures = 0
+        self.healthy = True
+
+
+class EndpointPool:
+    """
+    Routes requests across Ollama servers by least outstanding requests.
+
+    An endpoint is marked unhealthy after `max_failures` consecutive failures
+    and skipped until a background thread's probe finds it reachable again.
+    """
+
+    def __init__(self, urls: Iterable[str], max_failures: int = 3, probe_interval: float = 10.0,
+                 probe: Optional[Callable[[str], bool]] = None):
+        """
+        Initialize the pool.
+
+        Args:
+            urls: Base URLs of the servers
+            max_failures: Consecutive failures after which an endpoint is taken out of rotation
+            probe_interval: Seconds between health probes of unhealthy endpoints
+            probe: Returns True if the server at a base URL is reachable
+        """
+        self.endpoints = [Endpoint(url) for url in urls]
+        if not self.endpoints:
+            raise ValueError("At least one Ollama endpoint is required")
+        self.max_failures = max_failures
+        self.probe_interval = probe_interval
+        self.probe = probe
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._prober = None
+
+    @property
+    def urls(self) -> List[str]:
+        """Base URLs of all endpoints, in configuration order."""
+        return [endpoint.url for endpoint in self.endpoints]
+
+    def acquire(self, exclude: Iterable[Endpoint] = ()) -> Optional[Endpoint]:
+        """
+        Reserve the endpoint with the fewest requests in flight.
+
+        Healthy endpoints are preferred; if none is left, unhealthy ones are tried
+        rather than failing outright.
+
+        Args:
+            exclude: Endpoints already tried for this request
+
+        Returns:
+            Optional[Endpoint]: Reserved endpoint, or None if every endpoint was excluded
+        """
+        exclude = set(map(id, exclude))
+        with self._lock:
+            candidates = [endpoint for endpoint in self.endpoints if id(endpoint) not in exclude]
+            healthy = [endpoint for endpoint in candidates if endpoint.healthy]
+            if not candidates:
+                return None
+            endpoint = min(healthy or candidates, key=lambda item: (item.outstanding, item.served))
+            endpoint.outstanding += 1
+            endpoint.served += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint, ok: Optional[bool]) -> None:
+        """
+        Return a reserved endpoint and record the outcome of its request.
+
+        Args:
+            endpoint: Endpoint from `acquire`
+            ok: Whether the request succeeded; None if it was abandoned (e.g. cancelled)
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            if ok is None:
+                return
+            if ok:
+                endpoint.failures = 0
+                endpoint.healthy = True
+                return
+            endpoint.failures += 1
+            if endpoint.healthy and endpoint.failures >= self.max_failures:
+                endpoint.healthy = False
+                self._start_prober()
+
+    def _start_prober(self) -> None:
+        """Start the background probe thread unless it is already running (lock held)."""
+        if self.probe is None or self._prober is not None:
+            return
+        self._prober = threading.Thread(target=self._probe_loop, name="ollama-endpoint-probe", daemon=True)
+        self._prober.start()
+
+    def _probe_loop(self) -> None:
+        """Probe unhealthy endpoints until all of them have recovered."""
+        while not self._stop.wait(self.probe_interval):
+            with self._lock:
+                unhealthy = [endpoint for endpoint in self.endpoints if not endpoint.healthy]
+                if not unhealthy:
+                    # Cleared under the lock so a later failure starts a new prober
+                    self._prober = None
+                    return
+            for endpoint in unhealthy:
+                try:
+                    recovered = self.probe(endpoint.url)
+                except Exception:
+                    recovered = False
+                if recovered:
+                    with self._lock:
+                        endpoint.failures = 0
+                        endpoint.healthy = True
+
+    def status(self) -> Dict[str, Dict[str, object]]:
+        """
+        Describe the routing state of every endpoint.
+
+        Returns:
+            Dict[str, Dict[str, object]]: url -> healthy, outstanding, served and failures
+        """
+        with self._lock:
+            return {
+                endpoint.url: {
+                    "healthy": endpoint.healthy,
+                    "outstanding": endpoint.outstanding,
+                    "served": endpoint.served,
+                    "failures": endpoint.failures
+                }
+                for endpoint in self.endpoints
+            }
+
+    def close(self) -> None:
+        """Stop the background probe thread."""
+        self._stop.set()
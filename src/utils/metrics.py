@@ -0,0 +1,98 @@
+import contextvars
+import threading
+from typing import Dict
+
+
+class RunMetrics:
+    """Thread-safe counters collected while a workflow runs."""
+
+    def __init__(self):
+        """Initialize an empty set of counters."""
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, amount: float = 1) -> None:
+        """
+        Add to a named counter, creating it if needed.
+
+        Args:
+            name: Counter name
+            amount: Value to add
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def get(self, name: str) -> float:
+        """Get the current value of a counter (0 if it was never incremented)."""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Get a copy of all counters."""
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self) -> None:
+        """Clear all counters at the start of a run."""
+        with self._lock:
+            self._counters = {}
+
+    def report(self) -> str:
+        """Render the counters as a run summary."""
+        counters = self.snapshot()
+        if not counters:
+            return "No run metrics recorded."
+        return "\n".join(f"{name}: {value:g}" for name, value in sorted(counters.items()))
+
+
+# Metrics of the run in progress in the current context, set by `ScopedRunMetrics.start`
+_current_metrics = contextvars.ContextVar("run_metrics")
+
+
+class ScopedRunMetrics:
+    """
+    Counters of the run in progress, wherever they are incremented.
+
+    Each workflow run starts its own RunMetrics in its context, and the threads
+    running its tasks share them through a copy of that context, so runs in the
+    same process never count into each other's metrics. Counters incremented
+    outside any run go to process-wide metrics.
+    """
+
+    def __init__(self):
+        """Initialize with empty process-wide metrics."""
+        self._process = RunMetrics()
+
+    def current(self) -> RunMetrics:
+        """Get the metrics of the run in progress in this context."""
+        return _current_metrics.get(self._process)
+
+    def start(self) -> RunMetrics:
+        """Start empty metrics for a run in the current context."""
+        metrics = RunMetrics()
+        _current_metrics.set(metrics)
+        return metrics
+
+    def increment(self, name: str, amount: float = 1) -> None:
+        """Add to a named counter of the current run."""
+        self.current().increment(name, amount)
+
+    def get(self, name: str) -> float:
+        """Get the current value of a counter of the current run."""
+        return self.current().get(name)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Get a copy of all counters of the current run."""
+        return self.current().snapshot()
+
+    def reset(self) -> None:
+        """Clear all counters of the current run."""
+        self.current().reset()
+
+    def report(self) -> str:
+        """Render the counters of the current run as a run summary."""
+        return self.current().report()
+
+
+# Metrics shared by the model connector, agents and workflow engine, scoped to the current run
+run_metrics = ScopedRunMetrics()
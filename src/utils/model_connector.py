@@ -1,7 +1,101 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+import asyncio
 import os
+import threading
+import weakref
 
+import httpx
+import requests
 from crewai import LLM
+from requests.adapters import HTTPAdapter
+
+from src.utils.admission import AdmissionController, AdmissionRejected
+from src.utils.endpoint_pool import EndpointPool
+from src.utils.metrics import run_metrics
+from src.utils.response_cache import ResponseCache
+from src.utils.single_flight import SingleFlight
+from src.utils.token_budget import TokenBudget
+
+
+class ConnectorLLM(LLM):
+    """crewai LLM whose completions go through a ModelConnector and its response cache."""
+    
+    def __new__(cls, *args, **kwargs):
+        # crewai.LLM can hand back a provider-specific class for some model names;
+        # a connector handle always stays a ConnectorLLM
+        return object.__new__(cls)
+    
+    def __init__(self, model: str, connector: Any = None, use_cache: bool = True,
+                 context_window: Optional[int] = None, **kwargs):
+        """
+        Create a handle for a model served through a connector.
+        
+        Args:
+            model: Ollama model name
+            connector: ModelConnector that sends the requests
+            use_cache: False bypasses the response cache
+            context_window: Context window in tokens (defaults to the connector's)
+            **kwargs: crewai LLM settings, e.g. base_url, temperature and max_tokens
+        """
+        super().__init__(model=model, **kwargs)
+        self.connector = connector
+        self.use_cache = use_cache
+        self.context_window = context_window
+    
+    @property
+    def stop_words(self) -> List[str]:
+        """Stop words of the handle; newer crewai passes ReAct stop words as `stop_sequences`."""
+        stop = getattr(self, "stop_sequences", None) or getattr(self, "stop", None)
+        return list(stop or [])
+    
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs) -> str:
+        """
+        Complete a chat through the connector.
+        
+        Args:
+            messages: Prompt string or list of chat messages
+        
+        Returns:
+            str: Model response text
+        """
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        return self.connector.complete(messages, self)
+    
+    async def acall(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs) -> str:
+        """
+        Complete a chat through the connector's async client.
+        
+        Args:
+            messages: Prompt string or list of chat messages
+        
+        Returns:
+            str: Model response text
+        """
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        return await self.connector.acomplete(messages, self)
+    
+    def fit_prompt(self, sections: List[str], overhead: str = "") -> List[str]:
+        """
+        Shorten prompt sections so the prompt and `max_tokens` of output fit the context window.
+        
+        Args:
+            sections: Variable content of the prompt
+            overhead: Fixed prompt text around the sections, including the system message
+        
+        Returns:
+            List[str]: The sections, shortened where needed
+        """
+        return self.connector.token_budget.fit(self, sections, overhead)
+    
+    def supports_stop_words(self) -> bool:
+        """Ollama honors stop words for every model."""
+        return True
+    
+    def supports_function_calling(self) -> bool:
+        """Tools are driven through ReAct-style text prompts."""
+        return False
 
 
 class ModelConnector:
@@ -16,26 +110,507 @@ class ModelConnector:
         """
         self.config = config
         self.model = None
+        self.uncached_model = None
+        self.settings = {}
+        self.base_url = None
+        self.embedding_model = None
+        self.keep_alive = None
+        self.response_cache = None
+        self.token_budget = None
+        self.single_flight = SingleFlight()
+        self.admission_config = self.config.get("admission") or {}
+        self.admission_controllers = {}
+        self.http_config = self.config.get("http") or {}
+        self.routing_config = self.config.get("routing") or {}
+        self.session = self._create_session()
+        self.endpoint_pools = {}
+        self._pools_lock = threading.Lock()
+        # One async client per event loop, since clients are bound to the loop that created them
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._async_lock = threading.Lock()
         self._configure_model()
     
     def _configure_model(self) -> None:
         """Configure the model based on the provided configuration."""
         provider = self.config.get("provider", "ollama")
         model_name = self.config.get("name", "llama3.1:latest")
-        base_url = self.config.get("base_url", "http://localhost:11434")
+        base_url = self._deployment(self.config.get("base_url", "http://localhost:11434"))
         temperature = self.config.get("temperature", 0.7)
         max_tokens = self.config.get("max_tokens", 2000)
         
-        if provider.lower() == "ollama":
-            self.model = LLM(
-                model=f"ollama/{model_name}",
-                base_url=base_url,
-                temperature=temperature,
-                max_tokens=max_tokens
+        self.base_url = base_url
+        self.embedding_model = self.config.get("embedding_model", model_name)
+        self.keep_alive = self.config.get("keep_alive")
+        self.token_budget = TokenBudget(
+            context_window=self.config.get("context_window", 8192),
+            chars_per_token=self.config.get("chars_per_token", 4.0)
+        )
+        
+        cache_config = self.config.get("cache") or {}
+        if cache_config.get("enabled", False):
+            self.response_cache = ResponseCache(
+                cache_config.get("path", "./data/cache/llm_responses.db"),
+                max_entries=cache_config.get("max_entries", 5000),
+                ttl_seconds=cache_config.get("ttl_seconds")
             )
+        
+        if provider.lower() == "ollama":
+            self.settings = {
+                "model": model_name,
+                "base_url": base_url,
+                "temperature": temperature,
+                "max_tokens": max_tokens
+            }
+            self.model = ConnectorLLM(connector=self, **self.settings)
+            self.uncached_model = ConnectorLLM(connector=self, use_cache=False, **self.settings)
         else:
             raise ValueError(f"Unsupported model provider: {provider}")
     
-    def get_model(self) -> Any:
-        """Get the configured model instance."""
-        return self.model 
\ No newline at end of file
+    def _deployment(self, base_url: Any) -> str:
+        """Address one or several Ollama servers as a single comma-separated base URL."""
+        if isinstance(base_url, (list, tuple)):
+            return ",".join(url.rstrip("/") for url in base_url)
+        return base_url.rstrip("/")
+    
+    def create_model(self, overrides: Optional[Dict[str, Any]] = None, use_cache: bool = True) -> ConnectorLLM:
+        """
+        Create a model handle whose settings differ from the configured model.
+        
+        Args:
+            overrides: Any of name, base_url, temperature, max_tokens and context_window
+            use_cache: False returns a handle that always generates a fresh response
+        
+        Returns:
+            ConnectorLLM: Handle routed through this connector
+        """
+        if not overrides:
+            return self.get_model(use_cache)
+        
+        settings = dict(self.settings)
+        if "name" in overrides:
+            settings["model"] = overrides["name"]
+        if "base_url" in overrides:
+            settings["base_url"] = self._deployment(overrides["base_url"])
+        for key in ("temperature", "max_tokens", "context_window"):
+            if key in overrides:
+                settings[key] = overrides[key]
+        return ConnectorLLM(connector=self, use_cache=use_cache, **settings)
+    
+    def _create_session(self) -> requests.Session:
+        """Create the pooled HTTP session shared by health checks, chat and embedding calls."""
+        pool_size = self.http_config.get("pool_size", 32)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if not self.http_config.get("keep_alive", True):
+            session.headers["Connection"] = "close"
+        return session
+    
+    def endpoint_pool(self, base_url: str) -> EndpointPool:
+        """
+        Get the endpoint pool for a (possibly comma-separated) base URL.
+        
+        Args:
+            base_url: One Ollama base URL, or several joined by commas
+        
+        Returns:
+            EndpointPool: Pool routing requests across the servers
+        """
+        with self._pools_lock:
+            if base_url not in self.endpoint_pools:
+                self.endpoint_pools[base_url] = EndpointPool(
+                    [url for url in base_url.split(",") if url],
+                    max_failures=self.routing_config.get("max_failures", 3),
+                    probe_interval=self.routing_config.get("probe_interval", 10),
+                    probe=self._probe
+                )
+            return self.endpoint_pools[base_url]
+    
+    def admission(self, url: str) -> AdmissionController:
+        """
+        Get the admission controller of one Ollama server.
+        
+        Args:
+            url: Base URL of the server
+        
+        Returns:
+            AdmissionController: Adaptive concurrency limit shared by all requests to the server
+        """
+        with self._pools_lock:
+            if url not in self.admission_controllers:
+                config = self.admission_config
+                self.admission_controllers[url] = AdmissionController(
+                    initial_limit=config.get("initial_limit", 4),
+                    min_limit=config.get("min_limit", 1),
+                    max_limit=config.get("max_limit", 16),
+                    queue_size=config.get("queue_size", 64),
+                    policy=config.get("policy", "wait"),
+                    queue_timeout=config.get("queue_timeout", 120),
+                    latency_tolerance=config.get("latency_tolerance", 2.0),
+                    target_latency=config.get("target_latency")
+                )
+            return self.admission_controllers[url]
+    
+    def capacity(self, base_url: Optional[str] = None) -> int:
+        """
+        Get how many requests a deployment currently admits at once.
+        
+        Args:
+            base_url: Base URL of the deployment (defaults to the configured model's)
+        
+        Returns:
+            int: Sum of the admission limits of the deployment's endpoints
+        """
+        pool = self.endpoint_pool(base_url or self.base_url)
+        return sum(int(self.admission(url).limit) for url in pool.urls)
+    
+    def _token_latency(self, path: str, response) -> Optional[float]:
+        """
+        Generation seconds per token of a successful chat request, the admission latency sample.
+        
+        Taken from Ollama's `eval_duration` and `eval_count`, which exclude prompt
+        evaluation and model loading; None when the server does not report them.
+        """
+        if path != "/api/chat" or response.status_code != 200:
+            return None
+        body = response.json()
+        if not body.get("eval_count") or body.get("eval_duration") is None:
+            return None
+        return body["eval_duration"] / 1e9 / body["eval_count"]
+    
+    def _probe(self, url: str) -> bool:
+        """Check whether the Ollama server at a base URL answers."""
+        response = self.session.get(f"{url}/api/tags", timeout=self.config.get("health_timeout", 10))
+        return response.status_code == 200
+    
+    def _retries(self, pool: EndpointPool) -> int:
+        """Number of healthy peers a failed request is retried on."""
+        return self.routing_config.get("retries", len(pool.endpoints) - 1)
+    
+    def _request(self, base_url: str, method: str, path: str, timeout: float, **kwargs) -> requests.Response:
+        """
+        Send a request to the least busy endpoint, retrying connection errors,
+        server errors and admission rejections on a peer.
+        
+        Args:
+            base_url: Base URL of the deployment (see `endpoint_pool`)
+            method: HTTP method
+            path: Request path, e.g. /api/chat
+            timeout: Request timeout in seconds
+        
+        Returns:
+            requests.Response: Successful response
+        
+        Raises:
+            AdmissionRejected: If every endpoint tried was saturated
+        """
+        pool = self.endpoint_pool(base_url)
+        tried = []
+        error = None
+        for attempt in range(self._retries(pool) + 1):
+            endpoint = pool.acquire(exclude=tried)
+            if endpoint is None:
+                break
+            tried.append(endpoint)
+            if attempt:
+                run_metrics.increment("llm_endpoint_retries")
+            controller = self.admission(endpoint.url)
+            try:
+                admitted_at = controller.acquire()
+            except AdmissionRejected as rejected:
+                pool.release(endpoint, ok=None)
+                error = rejected
+                continue
+            try:
+                response = self.session.request(method, f"{endpoint.url}{path}", timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as request_error:
+                controller.release(admitted_at, ok=False)
+                pool.release(endpoint, ok=False)
+                error = request_error
+                continue
+            except BaseException:
+                controller.release(admitted_at, ok=None)
+                pool.release(endpoint, ok=None)
+                raise
+            
+            ok = response.status_code < 500
+            controller.release(admitted_at, ok, self._token_latency(path, response))
+            pool.release(endpoint, ok)
+            if not ok:
+                error = requests.HTTPError(f"{response.status_code} from {endpoint.url}{path}", response=response)
+                continue
+            response.raise_for_status()
+            return response
+        raise error
+    
+    async def _arequest(self, base_url: str, path: str, payload: Dict[str, Any]) -> httpx.Response:
+        """Async variant of `_request` for POST requests; waiting for admission does not block the loop."""
+        pool = self.endpoint_pool(base_url)
+        client = self._async_client_for_loop()
+        tried = []
+        error = None
+        for attempt in range(self._retries(pool) + 1):
+            endpoint = pool.acquire(exclude=tried)
+            if endpoint is None:
+                break
+            tried.append(endpoint)
+            if attempt:
+                run_metrics.increment("llm_endpoint_retries")
+            controller = self.admission(endpoint.url)
+            try:
+                admitted_at = await controller.aacquire()
+            except AdmissionRejected as rejected:
+                pool.release(endpoint, ok=None)
+                error = rejected
+                continue
+            except BaseException:
+                pool.release(endpoint, ok=None)
+                raise
+            try:
+                response = await client.post(f"{endpoint.url}{path}", json=payload)
+            except httpx.TransportError as request_error:
+                controller.release(admitted_at, ok=False)
+                pool.release(endpoint, ok=False)
+                error = request_error
+                continue
+            except BaseException:
+                controller.release(admitted_at, ok=None)
+                pool.release(endpoint, ok=None)
+                raise
+            
+            ok = response.status_code < 500
+            controller.release(admitted_at, ok, self._token_latency(path, response))
+            pool.release(endpoint, ok)
+            if not ok:
+                error = httpx.HTTPStatusError(
+                    f"{response.status_code} from {endpoint.url}{path}", request=response.request, response=response
+                )
+                continue
+            response.raise_for_status()
+            return response
+        raise error
+    
+    def list_models(self) -> List[str]:
+        """
+        List the models available on the Ollama server.
+        
+        Returns:
+            List[str]: Model names, e.g. "llama3.1:latest"
+        
+        Raises:
+            requests.RequestException: If no server can be reached or returns an error
+        """
+        response = self._request(self.base_url, "GET", "/api/tags", self.config.get("health_timeout", 10))
+        return [model.get("name") for model in response.json().get("models", [])]
+    
+    def preload(self, llm: ConnectorLLM) -> None:
+        """
+        Load a model on every endpoint of its deployment ahead of the first request.
+        
+        An Ollama chat request without messages only loads the model, so the first
+        real request does not wait for it. Sent directly rather than through
+        admission, since the load time is not a generation latency.
+        
+        Args:
+            llm: LLM handle whose model and base URL to load
+        
+        Raises:
+            requests.RequestException: If an endpoint cannot be reached or returns an error
+        """
+        payload = {"model": llm.model, "messages": []}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        for url in self.endpoint_pool(llm.base_url).urls:
+            response = self.session.post(f"{url}/api/chat", json=payload, timeout=self.config.get("timeout", 300))
+            response.raise_for_status()
+    
+    def get_model(self, use_cache: bool = True) -> Any:
+        """
+        Get the configured model instance.
+        
+        Args:
+            use_cache: False returns a handle that always generates a fresh response
+        """
+        return self.model if use_cache else self.uncached_model
+    
+    def complete(self, messages: List[Dict[str, Any]], llm: ConnectorLLM) -> str:
+        """
+        Complete a chat, serving identical requests from the response cache.
+        
+        Concurrent identical requests are coalesced so only one generation runs.
+        
+        Args:
+            messages: Chat messages
+            llm: Handle whose model settings apply to the request
+        
+        Returns:
+            str: Model response text
+        """
+        if not llm.use_cache:
+            return self._chat(messages, llm)
+        
+        key = self._request_key(messages, llm)
+        response, shared = self.single_flight.do(key, lambda: self._cached_chat(key, messages, llm))
+        if shared:
+            run_metrics.increment("llm_requests_coalesced")
+        return response
+    
+    async def acomplete(self, messages: List[Dict[str, Any]], llm: ConnectorLLM) -> str:
+        """
+        Async variant of `complete` for fan-out workloads.
+        
+        Requests share one pooled HTTP client per event loop and wait for
+        admission by each endpoint's adaptive concurrency limit, so callers
+        can gather hundreds of calls without overloading Ollama.
+        
+        Args:
+            messages: Chat messages
+            llm: Handle whose model settings apply to the request
+        
+        Returns:
+            str: Model response text
+        """
+        if not llm.use_cache:
+            return await self._achat(messages, llm)
+        
+        key = self._request_key(messages, llm)
+        response, shared = await self.single_flight.ado(key, lambda: self._acached_chat(key, messages, llm))
+        if shared:
+            run_metrics.increment("llm_requests_coalesced")
+        return response
+    
+    def _request_key(self, messages: List[Dict[str, Any]], llm: ConnectorLLM) -> str:
+        """Build the cache and coalescing key of a request."""
+        return ResponseCache.make_key(
+            {
+                "model": llm.model,
+                "base_url": llm.base_url,
+                "temperature": llm.temperature,
+                "max_tokens": llm.max_tokens,
+                "stop": llm.stop_words
+            },
+            messages
+        )
+    
+    def _cached_chat(self, key: str, messages: List[Dict[str, Any]], llm: ConnectorLLM) -> str:
+        """Look a request up in the response cache, generating and storing it on a miss."""
+        if self.response_cache is None:
+            return self._chat(messages, llm)
+        
+        response = self.response_cache.get(key)
+        if response is not None:
+            run_metrics.increment("llm_cache_hits")
+            return response
+        
+        run_metrics.increment("llm_cache_misses")
+        response = self._chat(messages, llm)
+        self.response_cache.put(key, response)
+        return response
+    
+    async def _acached_chat(self, key: str, messages: List[Dict[str, Any]], llm: ConnectorLLM) -> str:
+        """Async variant of `_cached_chat`; the SQLite cache is accessed off the event loop."""
+        if self.response_cache is None:
+            return await self._achat(messages, llm)
+        
+        response = await asyncio.to_thread(self.response_cache.get, key)
+        if response is not None:
+            run_metrics.increment("llm_cache_hits")
+            return response
+        
+        run_metrics.increment("llm_cache_misses")
+        response = await self._achat(messages, llm)
+        await asyncio.to_thread(self.response_cache.put, key, response)
+        return response
+    
+    def _chat_payload(self, messages: List[Dict[str, Any]], llm: ConnectorLLM) -> Dict[str, Any]:
+        """Build the body of a non-streaming Ollama chat request."""
+        options = {"temperature": llm.temperature, "num_predict": llm.max_tokens}
+        if llm.stop_words:
+            options["stop"] = llm.stop_words
+        payload = {"model": llm.model, "messages": messages, "stream": False, "options": options}
+        if self.keep_alive is not None:
+            # How long Ollama keeps the model (and its prompt cache) loaded after the request
+            payload["keep_alive"] = self.keep_alive
+        return payload
+    
+    def _chat_content(self, messages: List[Dict[str, Any]], llm: ConnectorLLM, body: Dict[str, Any]) -> str:
+        """Take the text of a chat response, calibrating the token budget from its prompt size."""
+        chars = sum(len(str(message.get("content", ""))) for message in messages)
+        self.token_budget.observe(llm.model, chars, body.get("prompt_eval_count", 0))
+        return body["message"]["content"]
+    
+    def _chat(self, messages: List[Dict[str, Any]], llm: ConnectorLLM) -> str:
+        """Send a non-streaming request to the Ollama chat endpoint."""
+        response = self._request(
+            llm.base_url, "POST", "/api/chat", self.config.get("timeout", 300),
+            json=self._chat_payload(messages, llm)
+        )
+        return self._chat_content(messages, llm, response.json())
+    
+    def _async_client_for_loop(self) -> httpx.AsyncClient:
+        """Get the pooled async client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._async_lock:
+            client = self._async_clients.get(loop)
+            if client is None or client.is_closed:
+                pool_size = self.http_config.get("pool_size", 32)
+                keep_alive = self.http_config.get("keep_alive", True)
+                client = httpx.AsyncClient(
+                    timeout=self.config.get("timeout", 300),
+                    limits=httpx.Limits(
+                        max_connections=pool_size,
+                        max_keepalive_connections=pool_size if keep_alive else 0,
+                        keepalive_expiry=self.http_config.get("keep_alive_expiry", 30)
+                    )
+                )
+                self._async_clients[loop] = client
+            return client
+    
+    async def _achat(self, messages: List[Dict[str, Any]], llm: ConnectorLLM) -> str:
+        """Async variant of `_chat`."""
+        response = await self._arequest(llm.base_url, "/api/chat", self._chat_payload(messages, llm))
+        return self._chat_content(messages, llm, response.json())
+    
+    def close(self) -> None:
+        """Close the pooled HTTP session and async clients and stop the endpoint health probes."""
+        for pool in self.endpoint_pools.values():
+            pool.close()
+        self.session.close()
+        
+        with self._async_lock:
+            clients = list(self._async_clients.items())
+            self._async_clients.clear()
+        for loop, client in clients:
+            if loop.is_closed():
+                # Its connections were bound to the loop and went with it
+                continue
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            else:
+                loop.run_until_complete(client.aclose())
+    
+    async def aclose(self) -> None:
+        """Close the async client of the running event loop."""
+        with self._async_lock:
+            client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+    
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Compute embeddings through the Ollama embeddings endpoint.
+        
+        Args:
+            texts: Texts to embed
+        
+        Returns:
+            List[List[float]]: One vector per text
+        """
+        payload = {"model": self.embedding_model, "input": texts}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        response = self._request(
+            self.base_url, "POST", "/api/embed", self.config.get("timeout", 300), json=payload
+        )
+        return response.json()["embeddings"]
\ No newline at end of file
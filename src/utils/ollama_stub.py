@@ -0,0 +1,262 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class OllamaStub:
+    """
+    Ollama-compatible stand-in for offline benchmarking and regression runs.
+
+    Serves the endpoints the application uses (`/api/tags`, `/api/chat` and
+    `/api/embed`). Chat and embedding requests are answered from a cassette
+    file of recorded responses, keyed by path, model and messages (or input),
+    so temperature and other options do not change the match. Requests
+    without a recording get a deterministic synthetic answer. In record mode
+    the stub forwards requests to a real Ollama server and appends its
+    answers to the cassette.
+
+    Every response is delayed by `latency` seconds plus the time to generate
+    its tokens at `tokens_per_second`, so throughput runs are repeatable
+    without a GPU.
+    """
+
+    def __init__(self, cassette: Optional[str] = None, record_url: Optional[str] = None,
+                 models: Optional[List[str]] = None, latency: float = 0.0,
+                 tokens_per_second: Optional[float] = None, reply_tokens: int = 200,
+                 embedding_dim: int = 768):
+        """
+        Initialize the stub.
+
+        Args:
+            cassette: Path of the JSONL cassette to replay from (and record to)
+            record_url: Base URL of a real Ollama server to record from
+            models: Model names reported by `/api/tags`
+            latency: Fixed seconds added to every chat and embedding response
+            tokens_per_second: Simulated generation speed (None generates instantly)
+            reply_tokens: Length in words of synthetic chat answers
+            embedding_dim: Size of synthetic embedding vectors
+        """
+        self.cassette = cassette
+        self.record_url = record_url.rstrip("/") if record_url else None
+        self.models = list(models or [])
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.reply_tokens = reply_tokens
+        self.embedding_dim = embedding_dim
+        self.recordings = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if self.cassette and self.record_url:
+            os.makedirs(os.path.dirname(os.path.abspath(self.cassette)), exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        """Read the recorded responses from the cassette, if it exists."""
+        if not self.cassette or not os.path.exists(self.cassette):
+            return
+        with open(self.cassette, "r", encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.recordings[entry["key"]] = entry["response"]
+                    model = entry["response"].get("model")
+                    if model and model not in self.models:
+                        self.models.append(model)
+
+    @staticmethod
+    def make_key(path: str, body: Dict[str, Any]) -> str:
+        """Build the cassette key of a request."""
+        content = body.get("messages") if path == "/api/chat" else body.get("input")
+        raw = json.dumps({"path": path, "model": body.get("model"), "content": content}, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def handle(self, method: str, path: str, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """
+        Answer one request.
+
+        Args:
+            method: HTTP method
+            path: Request path
+            body: Decoded JSON body (empty for GET requests)
+
+        Returns:
+            Tuple[int, Dict[str, Any]]: HTTP status and JSON response
+        """
+        if method == "GET" and path == "/api/tags":
+            return 200, {"models": [{"name": name, "model": name} for name in self.models]}
+        if method != "POST" or path not in ("/api/chat", "/api/embed"):
+            return 404, {"error": f"{method} {path} is not supported by the stub"}
+        if body.get("stream"):
+            return 400, {"error": "Streaming responses are not supported by the stub"}
+
+        key = self.make_key(path, body)
+        with self._lock:
+            response = self.recordings.get(key)
+            if response is not None:
+                self.hits += 1
+        if response is None and self.record_url:
+            response = self._record(key, path, body)
+        elif response is None:
+            with self._lock:
+                self.misses += 1
+            response = self._synthesize(path, body, key)
+
+        self._delay(response)
+        return 200, response
+
+    def _record(self, key: str, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Forward a request to the real server and append its response to the cassette."""
+        request = urllib.request.Request(
+            f"{self.record_url}{path}", data=json.dumps(body).encode("utf-8"),
+            headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(request, timeout=600) as upstream:
+            response = json.loads(upstream.read())
+        with self._lock:
+            self.recordings[key] = response
+            if self.cassette:
+                with open(self.cassette, "a", encoding="utf-8") as file:
+                    file.write(json.dumps({"key": key, "path": path, "response": response}) + "\n")
+        # The real server already took its time
+        response = dict(response, stub_recorded=True)
+        return response
+
+    def _synthesize(self, path: str, body: Dict[str, Any], key: str) -> Dict[str, Any]:
+        """Build a deterministic response for a request that was never recorded."""
+        rng = random.Random(key)
+        if path == "/api/embed":
+            inputs = body.get("input")
+            texts = [inputs] if isinstance(inputs, str) else list(inputs or [])
+            embeddings = []
+            for text in texts:
+                vector_rng = random.Random(hashlib.sha256(str(text).encode("utf-8")).hexdigest())
+                embeddings.append([vector_rng.gauss(0.0, 1.0) for _ in range(self.embedding_dim)])
+            return {"model": body.get("model"), "embeddings": embeddings}
+
+        messages = body.get("messages") or []
+        prompt_chars = sum(len(str(message.get("content", ""))) for message in messages)
+        words = ["candidate", "experience", "skills", "team", "project", "role", "strong", "python",
+                 "delivery", "design", "communication", "cloud", "ownership", "testing"]
+        lines = [
+            f"{number}. " + " ".join(rng.choice(words) for _ in range(max(1, self.reply_tokens // 5)))
+            for number in range(1, 6)
+        ]
+        content = "\n".join(lines)
+        # Prompts asking for a machine-readable verdict get one
+        if any("VERDICT:" in str(message.get("content", "")) for message in messages):
+            verdict = rng.choice(["Hire", "Consider", "Do Not Hire"])
+            content += f"\nVERDICT: {verdict}; SCORE: {rng.randint(40, 95)}"
+        # crewai agents parse ReAct-style output and need a final answer marker
+        if any("Final Answer:" in str(message.get("content", "")) for message in messages):
+            content = f"Thought: I now can give a great answer\nFinal Answer: {content}"
+        response = {
+            "model": body.get("model"),
+            "message": {"role": "assistant", "content": content},
+            "done": True,
+            "prompt_eval_count": prompt_chars // 4 + 1,
+            "eval_count": len(content.split())
+        }
+        if self.tokens_per_second:
+            # Generation time as Ollama reports it, in nanoseconds
+            response["eval_duration"] = int(response["eval_count"] / self.tokens_per_second * 1e9)
+        return response
+
+    def _delay(self, response: Dict[str, Any]) -> None:
+        """Sleep for the configured latency and generation time of a replayed response."""
+        if response.pop("stub_recorded", False):
+            return
+        delay = self.latency
+        if self.tokens_per_second:
+            delay += response.get("eval_count", 0) / self.tokens_per_second
+        if delay > 0:
+            time.sleep(delay)
+
+    def serve(self, host: str = "127.0.0.1", port: int = 11435) -> ThreadingHTTPServer:
+        """
+        Create an HTTP server for the stub; call `serve_forever` on it to start answering.
+
+        Args:
+            host: Interface to bind
+            port: Port to bind
+
+        Returns:
+            ThreadingHTTPServer: Server handling each request on its own thread
+        """
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self, method: str) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    body = json.loads(self.rfile.read(length)) if length else {}
+                    status, response = stub.handle(method, self.path, body)
+                except Exception as error:
+                    status, response = 500, {"error": str(error)}
+                payload = json.dumps(response).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self) -> None:
+                self._respond("GET")
+
+            def do_POST(self) -> None:
+                self._respond("POST")
+
+            def log_message(self, format: str, *args: Any) -> None:
+                # Request logs would dominate benchmark output
+                pass
+
+        return ThreadingHTTPServer((host, port), Handler)
+
+
+def main():
+    """Run the stub server from the command line."""
+    parser = argparse.ArgumentParser(description="Ollama-compatible record/replay stand-in server")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=11435, help="Port to bind")
+    parser.add_argument("--cassette", default="./data/cache/ollama_cassette.jsonl", help="Recorded responses (JSONL)")
+    parser.add_argument("--record", metavar="URL", help="Record from this Ollama server instead of only replaying")
+    parser.add_argument("--model", action="append", dest="models",
+                        help="Model name reported as pulled (repeatable; default: llama3.1:latest)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--tokens-per-second", type=float, help="Simulated generation speed")
+    parser.add_argument("--reply-tokens", type=int, default=200, help="Length of synthetic chat answers")
+    parser.add_argument("--embedding-dim", type=int, default=768, help="Size of synthetic embeddings")
+    args = parser.parse_args()
+
+    stub = OllamaStub(
+        cassette=args.cassette,
+        record_url=args.record,
+        models=args.models or ["llama3.1:latest"],
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        reply_tokens=args.reply_tokens,
+        embedding_dim=args.embedding_dim
+    )
+    server = stub.serve(args.host, args.port)
+    mode = f"recording from {args.record}" if args.record else "replaying"
+    print(f"Ollama stub on http://{args.host}:{args.port} ({mode} {len(stub.recordings)} responses from {args.cassette})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Replayed {stub.hits} recorded responses, synthesized {stub.misses}")
+
+
+if __name__ == "__main__":
+    main()
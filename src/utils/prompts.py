@@ -0,0 +1,63 @@
+import textwrap
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def layered_prompt(shared: str, prompt: str) -> str:
+    """
+    Join the content shared by a series of calls and the per-call content.
+
+    The shared part (job description, instructions) comes first so that calls
+    for different candidates start with the same tokens and Ollama can reuse
+    its KV cache for that prefix.
+
+    Args:
+        shared: Content identical across the calls, e.g. for every candidate of a job
+        prompt: Content specific to this call
+
+    Returns:
+        str: Prompt with the shared content first
+    """
+    if not shared:
+        return textwrap.dedent(prompt).strip()
+    return f"{textwrap.dedent(shared).strip()}\n\n{textwrap.dedent(prompt).strip()}"
+
+
+def agent_messages(config: Dict[str, Any], prompt: str, shared: str = "") -> List[Dict[str, str]]:
+    """
+    Build the chat messages for a direct LLM call made on behalf of an agent.
+
+    Args:
+        config: Agent configuration from YAML; its role and backstory become the system message
+        prompt: Task prompt, possibly indented inside a triple-quoted string
+        shared: Content identical across a series of calls, appended to the system
+            message so the per-call prompt is the only part that differs
+
+    Returns:
+        List[Dict[str, str]]: System and user messages
+    """
+    system = f"You are a {config.get('role')}. {config.get('backstory')}"
+    if shared:
+        system = f"{system}\n\n{textwrap.dedent(shared).strip()}"
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": textwrap.dedent(prompt).strip()}
+    ]
+
+
+def fit_sections(llm: Any, config: Dict[str, Any], layout: Callable[..., Tuple[str, str]],
+                 sections: List[str]) -> List[str]:
+    """
+    Shorten the variable sections of a prompt to the token budget of a model handle.
+
+    Args:
+        llm: Model handle the prompt is sent to
+        config: Agent configuration from YAML, for the system message
+        layout: Prompt builder returning (shared, per-call) parts for the given sections
+        sections: Variable content passed to `layout`, e.g. job description and transcript
+
+    Returns:
+        List[str]: The sections, shortened where the prompt would not fit
+    """
+    shared, prompt = layout(*([""] * len(sections)))
+    overhead = "\n".join(message["content"] for message in agent_messages(config, prompt, shared))
+    return llm.fit_prompt(sections, overhead)
@@ -0,0 +1,111 @@
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from src.utils.metrics import run_metrics
+from src.utils.score_cache import content_hash, normalize_text
+
+
+class RequisitionStore:
+    """
+    Persistent store of approved job descriptions.
+
+    Approved outputs are keyed by the task that produced them and the
+    normalized job title, skill set and experience level, so any workflow for
+    the same requisition reuses the approved text instead of generating (and
+    approving) it again, and tasks never read each other's outputs.
+    """
+
+    def __init__(self, store_path: str = "./data/index/requisitions.db"):
+        """
+        Initialize the requisition store.
+
+        Args:
+            store_path: SQLite file holding the job descriptions
+        """
+        self.store_path = store_path
+        os.makedirs(os.path.dirname(os.path.abspath(store_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS requisitions (
+                    key TEXT PRIMARY KEY,
+                    job_title TEXT NOT NULL,
+                    skills TEXT NOT NULL,
+                    experience TEXT NOT NULL,
+                    job_description TEXT NOT NULL,
+                    approved_at REAL NOT NULL
+                )
+                """
+            )
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection to the store file, committing on success."""
+        conn = sqlite3.connect(self.store_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def make_key(self, task_id: str, job_title: str, skills: str, experience: str) -> str:
+        """
+        Build the key of a task's output for a requisition.
+
+        Skills are compared as a set, so their order and case do not matter.
+
+        Args:
+            task_id: ID of the task whose output is stored
+            job_title: Job title
+            skills: Comma-separated required skills
+            experience: Required experience
+
+        Returns:
+            str: Requisition key
+        """
+        skill_set = sorted({normalize_text(skill) for skill in str(skills).split(",") if skill.strip()})
+        parts = [str(task_id), normalize_text(str(job_title)), ",".join(skill_set), normalize_text(str(experience))]
+        return content_hash("|".join(parts))
+
+    def get(self, task_id: str, job_title: str, skills: str, experience: str) -> Optional[str]:
+        """
+        Look up the approved output of a task for a requisition, counting the hit or miss.
+
+        Args:
+            task_id: ID of the task
+            job_title: Job title
+            skills: Comma-separated required skills
+            experience: Required experience
+
+        Returns:
+            Optional[str]: Approved output, or None if none was approved yet
+        """
+        key = self.make_key(task_id, job_title, skills, experience)
+        with self._connect() as conn:
+            row = conn.execute("SELECT job_description FROM requisitions WHERE key = ?", (key,)).fetchone()
+
+        run_metrics.increment("requisition_hits" if row else "requisition_misses")
+        return row[0] if row else None
+
+    def put(self, task_id: str, job_title: str, skills: str, experience: str, job_description: str) -> None:
+        """
+        Store the approved output of a task for a requisition, replacing an earlier one.
+
+        Args:
+            task_id: ID of the task
+            job_title: Job title
+            skills: Comma-separated required skills
+            experience: Required experience
+            job_description: Approved output
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO requisitions VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    self.make_key(task_id, job_title, skills, experience),
+                    str(job_title), str(skills), str(experience), job_description, time.time()
+                )
+            )
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+
+class ResponseCache:
+    """
+    Disk-backed LLM response cache with LRU and TTL eviction.
+
+    Responses are keyed by a hash of the model settings and the full message list,
+    so only byte-identical requests are served from the cache.
+    """
+
+    def __init__(self, cache_path: str = "./data/cache/llm_responses.db", max_entries: int = 5000,
+                 ttl_seconds: Optional[float] = None):
+        """
+        Initialize the response cache.
+
+        Args:
+            cache_path: SQLite file holding the cached responses
+            max_entries: Maximum number of responses kept before evicting the least recently used
+            ttl_seconds: Age after which a response is no longer served (None keeps them forever)
+        """
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection to the cache file, committing on success."""
+        conn = sqlite3.connect(self.cache_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(settings: Dict[str, Any], messages: List[Dict[str, Any]]) -> str:
+        """
+        Build the cache key for a request.
+
+        Args:
+            settings: Model name, base URL, temperature, max tokens and stop words
+            messages: Full chat message list
+
+        Returns:
+            str: Cache key
+        """
+        payload = json.dumps({"settings": settings, "messages": messages}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Key from `make_key`
+
+        Returns:
+            Optional[str]: Cached response, or None if missing or expired
+        """
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if not row:
+                return None
+            if self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def put(self, key: str, response: str) -> None:
+        """
+        Store a response and evict expired and least recently used entries.
+
+        Args:
+            key: Key from `make_key`
+            response: Response text
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", (key, response, now, now))
+            if self.ttl_seconds is not None:
+                conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+            excess = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                    (excess,)
+                )
@@ -0,0 +1,222 @@
+import datetime
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+PHONE_PATTERN = re.compile(r"\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}")
+LOCATION_PATTERN = re.compile(r"Location:\s*([^|\n]+)", re.IGNORECASE)
+YEARS_PATTERN = re.compile(r"(\d{1,2})\+?\s*(?:years|yrs)\b", re.IGNORECASE)
+PERIOD_PATTERN = re.compile(r"((?:19|20)\d{2})\s*[–—-]\s*((?:19|20)\d{2}|present|current)", re.IGNORECASE)
+BULLET_PATTERN = re.compile(r"^[\s•\-*·▪●]+")
+SECTION_KEYWORDS = (
+    "summary", "overview", "objective", "skills", "experience", "employment",
+    "education", "certification", "projects", "awards", "publications"
+)
+
+
+def _is_heading(line: str) -> bool:
+    """Check whether a line looks like a resume section heading."""
+    if not line or len(line) > 40 or any(char in line for char in "|:@•"):
+        return False
+    return any(keyword in line.lower() for keyword in SECTION_KEYWORDS)
+
+
+def _split_sections(lines: List[str]) -> Dict[str, List[str]]:
+    """Group resume lines under the section heading that precedes them."""
+    sections = {"header": []}
+    current = "header"
+    for line in lines:
+        if _is_heading(line):
+            current = line.lower()
+            sections.setdefault(current, [])
+        else:
+            sections[current].append(line)
+    return sections
+
+
+def _section(sections: Dict[str, List[str]], keyword: str) -> List[str]:
+    """Get the lines of every section whose heading mentions a keyword."""
+    return [line for heading, lines in sections.items() if keyword in heading for line in lines]
+
+
+def _extract_skills(lines: List[str]) -> List[str]:
+    """Collect skills from bullet lines such as 'Languages: Python, Java'."""
+    skills = []
+    for line in lines:
+        line = BULLET_PATTERN.sub("", line)
+        if ":" in line:
+            line = line.split(":", 1)[1]
+        for skill in line.split(","):
+            skill = re.sub(r"\(.*?\)", "", skill).strip(" .;")
+            if skill and skill.lower() not in (known.lower() for known in skills):
+                skills.append(skill)
+    return skills
+
+
+def _extract_roles(lines: List[str]) -> List[Dict[str, str]]:
+    """Collect 'Title | Company | Period' entries from the experience section."""
+    roles = []
+    for i, line in enumerate(lines):
+        if "|" not in line or line.startswith(("•", "-", "*")):
+            continue
+        parts = [part.strip() for part in re.sub(r"^\d+\.\s*", "", line).split("|")]
+        period = next((part for part in parts[1:] if PERIOD_PATTERN.search(part)), "")
+        if not period and i + 1 < len(lines) and PERIOD_PATTERN.search(lines[i + 1]):
+            # Some resumes put the period on the line below the role
+            period = lines[i + 1].strip("() ")
+        roles.append({
+            "title": parts[0],
+            "company": parts[1] if len(parts) > 1 and parts[1] != period else "",
+            "period": period
+        })
+    return roles
+
+
+def _extract_total_years(text: str) -> Optional[int]:
+    """Read the stated years of experience, falling back to the span of employment dates."""
+    stated = [int(years) for years in YEARS_PATTERN.findall(text)]
+    if stated:
+        return max(stated)
+
+    current_year = datetime.date.today().year
+    starts, ends = [], []
+    for start, end in PERIOD_PATTERN.findall(text):
+        starts.append(int(start))
+        ends.append(current_year if not end.isdigit() else int(end))
+    if starts:
+        return max(ends) - min(starts)
+    return None
+
+
+def extract_resume(text: str) -> Dict[str, Any]:
+    """
+    Parse a text resume into a compact structured record.
+
+    Args:
+        text: Raw resume text
+
+    Returns:
+        Dict[str, Any]: name, contact, skills, total_years and roles
+    """
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    sections = _split_sections(lines)
+
+    name = lines[0] if lines else ""
+    if ":" in name:
+        name = name.split(":", 1)[1].strip()
+    if name.isupper():
+        name = name.title()
+
+    email = EMAIL_PATTERN.search(text)
+    phone = PHONE_PATTERN.search(text)
+    location = LOCATION_PATTERN.search(text)
+
+    return {
+        "name": name,
+        "contact": {
+            "email": email.group(0) if email else "",
+            "phone": phone.group(0) if phone else "",
+            "location": location.group(1).strip() if location else ""
+        },
+        "skills": _extract_skills(_section(sections, "skills")),
+        "total_years": _extract_total_years(text),
+        "roles": _extract_roles(_section(sections, "experience") or lines)
+    }
+
+
+def format_profile(record: Dict[str, Any]) -> str:
+    """
+    Render a structured resume record as a compact prompt block.
+
+    Args:
+        record: Record from `extract_resume`
+
+    Returns:
+        str: Profile text, a fraction of the size of the full resume
+    """
+    contact = ", ".join(value for value in record.get("contact", {}).values() if value)
+    years = record.get("total_years")
+    roles = "; ".join(
+        " at ".join(part for part in (role["title"], role["company"]) if part)
+        + (f" ({role['period']})" if role["period"] else "")
+        for role in record.get("roles", [])
+    )
+    return "\n".join([
+        f"Name: {record.get('name', '')}",
+        f"Contact: {contact or 'not provided'}",
+        f"Total experience: {f'{years} years' if years is not None else 'not stated'}",
+        f"Skills: {', '.join(record.get('skills', [])) or 'not listed'}",
+        f"Roles: {roles or 'not listed'}"
+    ])
+
+
+class ResumeExtractor:
+    """Extracts structured resume records once per file, cached in sidecars keyed by content hash."""
+
+    def __init__(self, sidecar_dir: str = "./data/index/extracted"):
+        """
+        Initialize the extractor.
+
+        Args:
+            sidecar_dir: Directory holding one JSON record per resume content hash
+        """
+        self.sidecar_dir = sidecar_dir
+        self._records = {}
+        self._lock = threading.Lock()
+        os.makedirs(sidecar_dir, exist_ok=True)
+
+    def extract(self, text: str, content_hash: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get the structured record for a resume, parsing it only on first sight.
+
+        Args:
+            text: Raw resume text
+            content_hash: SHA-256 of the resume bytes, if the caller already has it
+
+        Returns:
+            Dict[str, Any]: Structured resume record
+        """
+        content_hash = content_hash or hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            if content_hash in self._records:
+                return self._records[content_hash]
+
+        sidecar_path = os.path.join(self.sidecar_dir, f"{content_hash}.json")
+        if os.path.exists(sidecar_path):
+            with open(sidecar_path, "r", encoding="utf-8") as file:
+                record = json.load(file)
+        else:
+            record = extract_resume(text)
+            # Write then rename so concurrent readers never see a partial file
+            temp_path = f"{sidecar_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(record, file)
+            os.replace(temp_path, sidecar_path)
+
+        with self._lock:
+            self._records[content_hash] = record
+        return record
+
+
+_default_extractor = None
+
+
+def resume_profile(resume: str) -> str:
+    """
+    Turn raw resume text into the compact profile the agents put in their prompts.
+
+    Args:
+        resume: Raw resume text
+
+    Returns:
+        str: Compact profile from the shared extraction cache
+    """
+    global _default_extractor
+    if _default_extractor is None:
+        _default_extractor = ResumeExtractor()
+    return format_profile(_default_extractor.extract(resume))
@@ -0,0 +1,335 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, TfidfVectorizer
+from sklearn.metrics.pairwise import linear_kernel
+
+from src.utils.dedup import DuplicateIndex
+from src.utils.resume_extractor import ResumeExtractor
+
+
+# Keeps technology names such as "c++", "c#" and "node.js" as single terms
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase lexical terms, dropping English stop words.
+
+    Args:
+        text: Raw text to tokenize
+
+    Returns:
+        List[str]: Terms in document order
+    """
+    return [
+        term for term in TOKEN_PATTERN.findall(text.lower())
+        if term not in ENGLISH_STOP_WORDS
+    ]
+
+
+def _identity(terms: List[str]) -> List[str]:
+    """Analyzer for documents that are already tokenized."""
+    return terms
+
+
+class ResumeIndex:
+    """
+    Lexical TF-IDF index over the resume store used to shortlist candidates.
+
+    Tokenized terms are persisted in a SQLite file next to the resume store, so
+    only resumes added, changed or deleted since the last run are re-read.
+    """
+
+    def __init__(self, resume_dir: str = "./data/resumes", index_path: Optional[str] = None):
+        """
+        Initialize the resume index.
+
+        Args:
+            resume_dir: Directory containing the text resumes
+            index_path: SQLite file holding the index (defaults to data/index/resume_index.db)
+        """
+        self.resume_dir = resume_dir
+        self.index_path = index_path or os.path.join(
+            os.path.dirname(os.path.abspath(resume_dir)), "index", "resume_index.db"
+        )
+        self.file_paths = []
+        self.vectorizer = None
+        self.matrix = None
+        self.generation = None
+        self.extractor = ResumeExtractor(os.path.join(os.path.dirname(self.index_path), "extracted"))
+        self.duplicates = DuplicateIndex(os.path.join(os.path.dirname(self.index_path), "duplicates.db"))
+        self._create_schema()
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection to the index file, committing on success."""
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _create_schema(self) -> None:
+        """Create the index table if it does not exist yet."""
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS resumes (
+                    file_name TEXT PRIMARY KEY,
+                    content_hash TEXT NOT NULL,
+                    mtime REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    terms TEXT NOT NULL,
+                    fields TEXT NOT NULL
+                )
+                """
+            )
+            # Bumped on every write so other processes can tell the index changed
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (generation INTEGER NOT NULL)")
+            if conn.execute("SELECT COUNT(*) FROM meta").fetchone()[0] == 0:
+                conn.execute("INSERT INTO meta VALUES (0)")
+
+    def _bump_generation(self, conn: sqlite3.Connection) -> None:
+        """Record that the indexed resumes changed."""
+        conn.execute("UPDATE meta SET generation = generation + 1")
+
+    def _upsert(self, conn: sqlite3.Connection, file_name: str, stat: os.stat_result,
+                previous_hash: Optional[str] = None) -> None:
+        """Read one resume and store its hash, terms and extracted fields."""
+        with open(os.path.join(self.resume_dir, file_name), "rb") as file:
+            content = file.read()
+        content_hash = hashlib.sha256(content).hexdigest()
+
+        if content_hash == previous_hash:
+            # Touched but not edited: only the stat fingerprint is stale
+            conn.execute(
+                "UPDATE resumes SET mtime = ?, size = ? WHERE file_name = ?",
+                (stat.st_mtime, stat.st_size, file_name)
+            )
+            return
+
+        text = content.decode("utf-8", errors="ignore")
+        conn.execute(
+            "INSERT OR REPLACE INTO resumes VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                file_name,
+                content_hash,
+                stat.st_mtime,
+                stat.st_size,
+                " ".join(tokenize(text)),
+                json.dumps(self.extractor.extract(text, content_hash))
+            )
+        )
+        self.duplicates.add(file_name, text)
+        self._bump_generation(conn)
+
+    def add(self, file_path: str) -> List[str]:
+        """
+        Index a resume that was just saved to the store.
+
+        Args:
+            file_path: Path of the saved resume
+
+        Returns:
+            List[str]: File names of near-duplicates already in the store
+        """
+        file_name = os.path.basename(file_path)
+        stat = os.stat(os.path.join(self.resume_dir, file_name))
+        with self._connect() as conn:
+            row = conn.execute("SELECT content_hash FROM resumes WHERE file_name = ?", (file_name,)).fetchone()
+            # Saving the same content again leaves the index and its generation as they are
+            self._upsert(conn, file_name, stat, row[0] if row else None)
+        return self.duplicates.duplicates_of(file_name)
+
+    def remove(self, file_path: str) -> None:
+        """
+        Drop a resume that was deleted from the store.
+
+        Args:
+            file_path: Path of the deleted resume
+        """
+        with self._connect() as conn:
+            conn.execute("DELETE FROM resumes WHERE file_name = ?", (os.path.basename(file_path),))
+            self._bump_generation(conn)
+        self.duplicates.remove(os.path.basename(file_path))
+
+    def sync(self) -> Tuple[int, int]:
+        """
+        Reconcile the index with the resume directory using mtime and size.
+
+        Returns:
+            Tuple[int, int]: Number of resumes (re)indexed and number removed
+        """
+        on_disk = {}
+        if os.path.isdir(self.resume_dir):
+            with os.scandir(self.resume_dir) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith(".txt"):
+                        on_disk[entry.name] = entry.stat()
+
+        with self._connect() as conn:
+            indexed = {
+                file_name: (content_hash, mtime, size)
+                for file_name, content_hash, mtime, size
+                in conn.execute("SELECT file_name, content_hash, mtime, size FROM resumes")
+            }
+
+            removed = [file_name for file_name in indexed if file_name not in on_disk]
+            if removed:
+                conn.executemany("DELETE FROM resumes WHERE file_name = ?", [(name,) for name in removed])
+                self._bump_generation(conn)
+                for file_name in removed:
+                    self.duplicates.remove(file_name)
+
+            updated = 0
+            for file_name, stat in on_disk.items():
+                previous = indexed.get(file_name)
+                if previous and previous[1] == stat.st_mtime and previous[2] == stat.st_size:
+                    continue
+                self._upsert(conn, file_name, stat, previous[0] if previous else None)
+                updated += 1
+
+        # Resumes indexed before duplicate detection existed still need a signature
+        unsigned = self._unsigned()
+        for file_name in unsigned:
+            with open(os.path.join(self.resume_dir, file_name), "r", encoding="utf-8", errors="ignore") as file:
+                self.duplicates.add(file_name, file.read())
+        if unsigned:
+            # Cluster maps cached by generation pick up the new signatures
+            with self._connect() as conn:
+                self._bump_generation(conn)
+
+        return updated, len(removed)
+
+    def _unsigned(self) -> List[str]:
+        """List the indexed resumes that have no MinHash signature in the duplicate index."""
+        with self._connect() as conn:
+            conn.execute("ATTACH DATABASE ? AS duplicates", (self.duplicates.index_path,))
+            return [
+                row[0] for row in conn.execute(
+                    "SELECT file_name FROM resumes "
+                    "WHERE file_name NOT IN (SELECT file_name FROM duplicates.signatures)"
+                )
+            ]
+
+    def get_fields(self, file_path: str) -> Dict[str, Any]:
+        """
+        Get the structured record extracted from an indexed resume.
+
+        Args:
+            file_path: Path of the resume
+
+        Returns:
+            Dict[str, Any]: Extracted fields, empty if the resume is not indexed
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT fields FROM resumes WHERE file_name = ?", (os.path.basename(file_path),)
+            ).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def documents(self) -> List[Tuple[str, List[str], Dict[str, Any]]]:
+        """
+        Load every indexed resume without touching the resume files.
+
+        Returns:
+            List[Tuple[str, List[str], Dict[str, Any]]]: (file path, terms, extracted fields)
+            in file-name order
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT file_name, terms, fields FROM resumes ORDER BY file_name").fetchall()
+        return [
+            (os.path.join(self.resume_dir, file_name), terms.split(), json.loads(fields))
+            for file_name, terms, fields in rows
+        ]
+
+    def content_hashes(self) -> Dict[str, str]:
+        """
+        Map every indexed resume to its content hash.
+
+        Returns:
+            Dict[str, str]: file path -> SHA-256 of the resume bytes
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT file_name, content_hash FROM resumes").fetchall()
+        return {os.path.join(self.resume_dir, file_name): content_hash for file_name, content_hash in rows}
+
+    def current_generation(self) -> int:
+        """Get the stored generation, which every change to the indexed resumes bumps."""
+        with self._connect() as conn:
+            return conn.execute("SELECT generation FROM meta").fetchone()[0]
+
+    def build(self) -> None:
+        """
+        Refit the TF-IDF matrix if the indexed resumes changed since the last build.
+
+        The resume directory is not scanned here: `sync()` runs once per job and
+        `add()` and `remove()` record uploads and deletes, all bumping the
+        generation this compares against.
+        """
+        with self._connect() as conn:
+            generation = conn.execute("SELECT generation FROM meta").fetchone()[0]
+            if generation == self.generation:
+                return
+            rows = conn.execute("SELECT file_name, terms FROM resumes ORDER BY file_name").fetchall()
+
+        self.generation = generation
+        self.file_paths = [os.path.join(self.resume_dir, file_name) for file_name, _ in rows]
+        self.vectorizer = None
+        self.matrix = None
+        if not rows:
+            return
+
+        vectorizer = TfidfVectorizer(analyzer=_identity, sublinear_tf=True)
+        try:
+            self.matrix = vectorizer.fit_transform([terms.split() for _, terms in rows])
+        except ValueError:
+            # Every document was empty or consisted only of stop words
+            return
+        self.vectorizer = vectorizer
+
+    def scores(self, query: str) -> np.ndarray:
+        """
+        Score every resume against a query.
+
+        Args:
+            query: Free text describing the role (skills, experience, job description)
+
+        Returns:
+            np.ndarray: Cosine similarity per resume, aligned with `file_paths`
+        """
+        if self.vectorizer is None:
+            self.build()
+        if self.vectorizer is None:
+            return np.zeros(len(self.file_paths))
+
+        query_vector = self.vectorizer.transform([tokenize(query)])
+        return linear_kernel(query_vector, self.matrix).ravel()
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Score every resume against a query and return the best matches.
+
+        Args:
+            query: Free text describing the role (skills, experience, job description)
+            top_k: Maximum number of resumes to return
+
+        Returns:
+            List[Tuple[str, float]]: (file path, similarity) pairs, best match first
+        """
+        if top_k <= 0:
+            return []
+        scores = self.scores(query)
+
+        # Stable sort keeps file-name order for equal scores
+        ranked = np.argsort(-scores, kind="stable")[:top_k]
+        return [(self.file_paths[i], float(scores[i])) for i in ranked]
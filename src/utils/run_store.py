@@ -0,0 +1,121 @@
+import json
+import os
+import re
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+# Run IDs are created as <date>-<time>-<6 hex digits>; anything else could name a path outside the store
+RUN_ID_PATTERN = re.compile(r"\d{8}-\d{6}-[0-9a-f]{6}")
+
+
+class RunStore:
+    """
+    Checkpoints of workflow runs on disk.
+
+    Each run gets a directory named by its run ID, holding `run.json` (workflow,
+    context and status) and one JSON file per completed task, so a failed run
+    can be resumed without regenerating the outputs it already has.
+    """
+
+    def __init__(self, root: str = "./data/runs"):
+        """
+        Initialize the store.
+
+        Args:
+            root: Directory holding one subdirectory per run
+        """
+        self.root = root
+
+    def _run_dir(self, run_id: str) -> str:
+        """
+        Directory of a run.
+
+        Raises:
+            ValueError: If the run ID is not one the store creates
+        """
+        if not isinstance(run_id, str) or not RUN_ID_PATTERN.fullmatch(run_id):
+            raise ValueError(f"Invalid run ID: {run_id!r}")
+        return os.path.join(self.root, run_id)
+
+    def _write(self, path: str, data: Dict[str, Any]) -> None:
+        """Write a JSON file atomically, so a crash never leaves a half-written checkpoint."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2, default=str)
+        os.replace(temporary, path)
+
+    def create(self, workflow_id: str, context: Dict[str, Any]) -> str:
+        """
+        Start a new run.
+
+        Args:
+            workflow_id: ID of the workflow being run
+            context: Context data of the run
+
+        Returns:
+            str: Run ID
+        """
+        run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self._write(os.path.join(self._run_dir(run_id), "run.json"), {
+            "run_id": run_id,
+            "workflow_id": workflow_id,
+            "context": context,
+            "status": "running",
+            "started_at": time.time()
+        })
+        return run_id
+
+    def load(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Get the workflow, context and status of a run, or None if it does not exist."""
+        path = os.path.join(self._run_dir(run_id), "run.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    def set_status(self, run_id: str, status: str, error: Optional[str] = None) -> None:
+        """
+        Record the status of a run.
+
+        Args:
+            run_id: Run ID
+            status: "running", "completed" or "failed"
+            error: Error message of a failed run
+        """
+        run = self.load(run_id) or {"run_id": run_id}
+        run["status"] = status
+        run["error"] = error
+        run["updated_at"] = time.time()
+        self._write(os.path.join(self._run_dir(run_id), "run.json"), run)
+
+    def save_task(self, run_id: str, task_id: str, output: str, duration: float) -> None:
+        """
+        Checkpoint the output of a completed task.
+
+        Args:
+            run_id: Run ID
+            task_id: ID of the completed task
+            output: Task output text
+            duration: Seconds the task took
+        """
+        self._write(os.path.join(self._run_dir(run_id), "tasks", f"{task_id}.json"), {
+            "task_id": task_id,
+            "output": output,
+            "duration": duration,
+            "completed_at": time.time()
+        })
+
+    def completed_tasks(self, run_id: str) -> Dict[str, str]:
+        """Get the outputs of the tasks a run has completed, keyed by task ID."""
+        tasks_dir = os.path.join(self._run_dir(run_id), "tasks")
+        if not os.path.isdir(tasks_dir):
+            return {}
+        outputs = {}
+        for file_name in sorted(os.listdir(tasks_dir)):
+            if file_name.endswith(".json"):
+                with open(os.path.join(tasks_dir, file_name), "r", encoding="utf-8") as file:
+                    checkpoint = json.load(file)
+                outputs[checkpoint["task_id"]] = checkpoint["output"]
+        return outputs
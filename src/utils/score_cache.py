@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from src.utils.metrics import run_metrics
+
+# Label the workflow engine puts before each upstream output, e.g. "Output of generate_job_description:"
+CONTEXT_LABEL = re.compile(r"^Output of [^\s:]+:[ \t]*$", re.MULTILINE)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse whitespace so cosmetic edits hash identically."""
+    return " ".join(text.lower().split())
+
+
+def strip_context_labels(text: str) -> str:
+    """Remove the workflow engine's "Output of <task>:" labels from upstream context."""
+    return CONTEXT_LABEL.sub("", text)
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 hex digest of a text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ScoreCache:
+    """
+    Persistent cache of resume match scores.
+
+    Entries are keyed by the normalized job description hash, the resume content
+    hash, the model settings and the scoring prompt version, and the least recently used entries are evicted
+    once the cache grows past `max_entries`.
+    """
+
+    def __init__(self, cache_path: str = "./data/index/score_cache.db", max_entries: int = 10000):
+        """
+        Initialize the score cache.
+
+        Args:
+            cache_path: SQLite file holding the cached scores
+            max_entries: Maximum number of scores kept before evicting
+        """
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS scores (
+                    key TEXT PRIMARY KEY,
+                    record TEXT NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS scores_last_used ON scores (last_used)")
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection to the cache file, committing on success."""
+        conn = sqlite3.connect(self.cache_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def make_key(self, job_description: str, resume_text: str, model: str, temperature: Any,
+                 prompt_version: str) -> str:
+        """
+        Build the cache key for a (job description, resume, model, prompt) combination.
+
+        The job description is hashed without the engine's context labels, so it
+        keys the same whether it came from an upstream task or was passed directly.
+
+        Args:
+            job_description: Job description the resume is scored against
+            resume_text: Full resume text
+            model: Model name
+            temperature: Sampling temperature
+            prompt_version: Version of the scoring prompt; scores of other versions are not reused
+
+        Returns:
+            str: Cache key
+        """
+        parts = [
+            content_hash(normalize_text(strip_context_labels(job_description))),
+            content_hash(resume_text),
+            str(model),
+            str(temperature),
+            str(prompt_version)
+        ]
+        return content_hash("|".join(parts))
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached score, counting the hit or miss in the run metrics.
+
+        Args:
+            key: Key from `make_key`
+
+        Returns:
+            Optional[Dict[str, Any]]: Cached score record, or None on a miss
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT record FROM scores WHERE key = ?", (key,)).fetchone()
+            if row:
+                conn.execute("UPDATE scores SET last_used = ? WHERE key = ?", (time.time(), key))
+
+        run_metrics.increment("score_cache_hits" if row else "score_cache_misses")
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, record: Dict[str, Any]) -> None:
+        """
+        Store a score and evict the least recently used entries above the size bound.
+
+        Args:
+            key: Key from `make_key`
+            record: Score record to cache
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO scores VALUES (?, ?, ?)",
+                (key, json.dumps(record), time.time())
+            )
+            excess = conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM scores WHERE key IN "
+                    "(SELECT key FROM scores ORDER BY last_used LIMIT ?)",
+                    (excess,)
+                )
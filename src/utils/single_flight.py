@@ -0,0 +1,93 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight wait for and share its result (or its exception).
+    """
+
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._calls: Dict[str, Future] = {}
+        self._async_calls: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, function: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run a function once per key among concurrent callers.
+
+        Args:
+            key: Identity of the call
+            function: Work to run if no identical call is in flight
+
+        Returns:
+            Tuple[Any, bool]: The result, and whether it was shared from another caller
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = function()
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def ado(self, key: str, function: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Await a coroutine once per key among concurrent tasks on the running event loop.
+
+        Args:
+            key: Identity of the call
+            function: Coroutine function to await if no identical call is in flight
+
+        Returns:
+            Tuple[Any, bool]: The result, and whether it was shared from another task
+        """
+        loop = asyncio.get_running_loop()
+        call_key = (loop, key)
+        with self._lock:
+            future = self._async_calls.get(call_key)
+            leader = future is None
+            if leader:
+                future = loop.create_future()
+                self._async_calls[call_key] = future
+
+        if not leader:
+            # Shielded so a cancelled waiter does not cancel the shared call
+            return await asyncio.shield(future), True
+
+        try:
+            result = await function()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            # Waiters still receive the exception; this only stops asyncio logging it as unretrieved
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._async_calls[call_key]
@@ -0,0 +1,213 @@
+import os
+import re
+from typing import Any, Dict, List, Set, Union
+
+import numpy as np
+from scipy import sparse
+
+
+# Common spellings and abbreviations mapped to one canonical skill name
+SKILL_ALIASES = {
+    "js": "javascript",
+    "ecmascript": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "python3": "python",
+    "golang": "go",
+    "k8s": "kubernetes",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "reactjs": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "angularjs": "angular",
+    "html5": "html",
+    "css3": "css",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "mongo": "mongodb",
+    "mssql": "sql server",
+    "amazon web services": "aws",
+    "gcp": "google cloud",
+    "google cloud platform": "google cloud",
+    "ms azure": "azure",
+    "microsoft azure": "azure",
+    "cicd": "ci/cd",
+    "ci cd": "ci/cd",
+    "ci/cd pipelines": "ci/cd",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "nlp": "natural language processing",
+    "rest": "rest apis",
+    "restful apis": "rest apis",
+    "restful api": "rest apis",
+    "rest api": "rest apis",
+    "agile scrum": "agile/scrum",
+    "scrum": "agile/scrum",
+    "tdd": "test-driven development",
+    "springboot": "spring boot",
+    "c sharp": "c#",
+    "cpp": "c++",
+}
+
+
+def normalize_skill(skill: str) -> str:
+    """
+    Map a skill name to its canonical lowercase form.
+
+    Args:
+        skill: Skill as written in a resume or job requirement
+
+    Returns:
+        str: Canonical skill name
+    """
+    skill = re.sub(r"\(.*?\)", "", skill)
+    skill = " ".join(skill.lower().split()).strip(" .;")
+    return SKILL_ALIASES.get(skill, skill)
+
+
+def parse_skills(skills: Union[str, List[str]]) -> List[str]:
+    """
+    Normalize a comma-separated skill string (or list) into unique canonical skills.
+
+    Args:
+        skills: e.g. "JS, k8s, Python"
+
+    Returns:
+        List[str]: Canonical skills in request order
+    """
+    if isinstance(skills, str):
+        skills = skills.split(",")
+    normalized = []
+    for skill in skills:
+        skill = normalize_skill(skill)
+        if skill and skill not in normalized:
+            normalized.append(skill)
+    return normalized
+
+
+class SkillMatcher:
+    """
+    Sparse skills x resumes matrix for deterministic skill coverage scoring.
+
+    Skills come from the structured resume records plus any known skill that
+    appears in a resume's tokenized text, so a requested skill list is scored
+    against every resume with a single sparse product.
+    """
+
+    def __init__(self, resume_index):
+        """
+        Initialize the matcher.
+
+        Args:
+            resume_index: ResumeIndex providing terms and extracted fields
+        """
+        self.resume_index = resume_index
+        self.file_paths = []
+        self.columns = {}
+        self.skill_ids = {}
+        self.matrix = None
+        self.generation = None
+
+    def build(self) -> None:
+        """
+        Rebuild the matrix if the resume index was rebuilt since the last build.
+
+        The resume index is not synced here: callers build it once per ranking,
+        so scoring and explaining many resumes never rescans the resume store.
+        """
+        if self.matrix is not None and self.generation == self.resume_index.generation:
+            return
+
+        documents = self.resume_index.documents()
+        declared = [
+            set(parse_skills(fields.get("skills", [])))
+            for _, _, fields in documents
+        ]
+        known = set(SKILL_ALIASES.values()).union(*declared) if declared else set()
+
+        resume_skills = []
+        for (_, terms, _), skills in zip(documents, declared):
+            mentioned = self._mentioned_skills(terms, known)
+            resume_skills.append(skills | mentioned)
+
+        vocabulary = sorted(set().union(*resume_skills)) if resume_skills else []
+        self.skill_ids = {skill: i for i, skill in enumerate(vocabulary)}
+        rows, cols = [], []
+        for col, skills in enumerate(resume_skills):
+            for skill in skills:
+                rows.append(self.skill_ids[skill])
+                cols.append(col)
+
+        self.matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(len(self.skill_ids), len(documents))
+        )
+        self.file_paths = [path for path, _, _ in documents]
+        self.columns = {os.path.basename(path): col for col, path in enumerate(self.file_paths)}
+        self.generation = self.resume_index.generation
+
+    def _mentioned_skills(self, terms: List[str], known: Set[str]) -> Set[str]:
+        """Find known skills among a resume's terms and adjacent term pairs."""
+        candidates = set(terms)
+        candidates.update(f"{first} {second}" for first, second in zip(terms, terms[1:]))
+        mentioned = set()
+        for candidate in candidates:
+            skill = SKILL_ALIASES.get(candidate, candidate)
+            if skill in known:
+                mentioned.add(skill)
+        return mentioned
+
+    def coverage(self, skills: Union[str, List[str]]) -> Dict[str, float]:
+        """
+        Score every resume by the fraction of requested skills it covers.
+
+        Args:
+            skills: Requested skills, comma-separated or as a list
+
+        Returns:
+            Dict[str, float]: Coverage in [0, 1] per resume path
+        """
+        self.build()
+        requested = parse_skills(skills)
+        if not requested or not self.file_paths:
+            return {path: 0.0 for path in self.file_paths}
+
+        query = np.zeros(len(self.skill_ids), dtype=np.float32)
+        for skill in requested:
+            if skill in self.skill_ids:
+                query[self.skill_ids[skill]] = 1.0
+
+        # One sparse product scores the request against every resume
+        matched = self.matrix.T.dot(query)
+        return {
+            path: float(count) / len(requested)
+            for path, count in zip(self.file_paths, matched)
+        }
+
+    def evidence(self, file_path: str, skills: Union[str, List[str]]) -> Dict[str, Any]:
+        """
+        Explain a resume's coverage score.
+
+        Args:
+            file_path: Path of the resume
+            skills: Requested skills, comma-separated or as a list
+
+        Returns:
+            Dict[str, Any]: coverage, matched_skills and missing_skills
+        """
+        self.build()
+        requested = parse_skills(skills)
+        col = self.columns.get(os.path.basename(file_path))
+
+        matched = []
+        if col is not None:
+            present = set(self.matrix[:, col].nonzero()[0])
+            matched = [skill for skill in requested if self.skill_ids.get(skill) in present]
+
+        return {
+            "coverage": len(matched) / len(requested) if requested else 0.0,
+            "matched_skills": matched,
+            "missing_skills": [skill for skill in requested if skill not in matched]
+        }
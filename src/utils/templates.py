@@ -0,0 +1,61 @@
+import re
+from typing import Any, Dict, List
+
+# A {{key}} placeholder; whitespace inside the braces is allowed
+PLACEHOLDER = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+
+
+class TaskTemplate:
+    """
+    Task description compiled once into literal text and placeholders.
+
+    Rendering fills every placeholder in a single pass over the precompiled
+    parts, and refuses to render when the context lacks a value, so an
+    unfilled `{{key}}` never reaches the LLM.
+    """
+
+    def __init__(self, text: str, name: str = ""):
+        """
+        Compile a template.
+
+        Args:
+            text: Description with `{{key}}` placeholders
+            name: Name used in error messages, e.g. the task ID
+
+        Raises:
+            ValueError: If the text contains a malformed placeholder
+        """
+        self.text = text
+        self.name = name
+        # split() alternates literal text and placeholder names
+        self._parts = PLACEHOLDER.split(text)
+        self.placeholders = list(dict.fromkeys(self._parts[1::2]))
+
+        leftover = "".join(self._parts[0::2])
+        if "{{" in leftover or "}}" in leftover:
+            raise ValueError(f"Malformed placeholder in {name or 'template'}: expected {{{{name}}}}")
+
+    def missing(self, context: Dict[str, Any]) -> List[str]:
+        """Get the placeholders the context has no value for."""
+        return [key for key in self.placeholders if key not in context]
+
+    def render(self, context: Dict[str, Any]) -> str:
+        """
+        Fill the placeholders from a context.
+
+        Args:
+            context: Values by placeholder name
+
+        Returns:
+            str: Rendered text
+
+        Raises:
+            ValueError: If the context lacks a value for a placeholder
+        """
+        missing = self.missing(context)
+        if missing:
+            raise ValueError(f"Missing context values for {self.name or 'template'}: {', '.join(missing)}")
+        parts = list(self._parts)
+        for position in range(1, len(parts), 2):
+            parts[position] = str(context[parts[position]])
+        return "".join(parts)
@@ -0,0 +1,132 @@
+import re
+import threading
+from typing import Any, List
+
+from src.utils.metrics import run_metrics
+
+
+class TokenBudget:
+    """
+    Estimate prompt tokens per model and fit prompt sections into its context window.
+
+    Tokens are estimated from character counts. The characters-per-token ratio
+    starts at `chars_per_token` and is calibrated per model from the
+    `prompt_eval_count` Ollama reports for each chat request.
+    """
+
+    def __init__(self, context_window: int = 8192, chars_per_token: float = 4.0):
+        """
+        Initialize the budget.
+
+        Args:
+            context_window: Context size (prompt plus output tokens) of models without their own setting
+            chars_per_token: Initial characters-per-token estimate for every model
+        """
+        self.context_window = context_window
+        self.chars_per_token = chars_per_token
+        self._ratios = {}
+        self._lock = threading.Lock()
+
+    def observe(self, model: str, chars: int, tokens: int) -> None:
+        """
+        Calibrate a model's characters-per-token ratio from a completed request.
+
+        Args:
+            model: Model name
+            chars: Characters in the request's messages
+            tokens: Prompt tokens the server evaluated
+        """
+        if chars <= 0 or tokens <= 0:
+            return
+        with self._lock:
+            ratio = self._ratios.get(model, self.chars_per_token)
+            # A prompt served partly from the KV cache reports fewer tokens; skip it
+            if chars / tokens > 2 * ratio:
+                return
+            self._ratios[model] = 0.8 * ratio + 0.2 * (chars / tokens)
+
+    def count(self, model: str, text: str) -> int:
+        """Estimate the number of tokens of a text for a model."""
+        with self._lock:
+            ratio = self._ratios.get(model, self.chars_per_token)
+        return int(len(text) / ratio) + 1
+
+    def available(self, llm: Any) -> int:
+        """Prompt tokens left after reserving the handle's `max_tokens` for the output."""
+        context_window = getattr(llm, "context_window", None) or self.context_window
+        return max(0, context_window - (llm.max_tokens or 0))
+
+    def fit(self, llm: Any, sections: List[str], overhead: str = "") -> List[str]:
+        """
+        Shorten prompt sections until the prompt fits the handle's budget.
+
+        Whitespace runs are collapsed first. If the prompt is still too long,
+        the longest sections are cut from the middle, keeping their beginning
+        and end, until all sections together fit. Sections shorter than an
+        equal share of the budget are left intact.
+
+        Args:
+            llm: Model handle the prompt is sent to (model, max_tokens, optional context_window)
+            sections: Variable content of the prompt, e.g. job description, profile and transcript
+            overhead: Fixed prompt text around the sections, including the system message
+
+        Returns:
+            List[str]: The sections, shortened where needed
+        """
+        model = llm.model
+        budget = self.available(llm) - self.count(model, overhead)
+        tokens = [self.count(model, section) for section in sections]
+        if sum(tokens) <= budget:
+            return list(sections)
+
+        run_metrics.increment("prompt_overflows")
+        sections = [self._compact(section) for section in sections]
+        tokens = [self.count(model, section) for section in sections]
+        if sum(tokens) <= budget:
+            return sections
+
+        allowances = self._allowances(tokens, max(0, budget))
+        fitted = []
+        for section, section_tokens, allowance in zip(sections, tokens, allowances):
+            if section_tokens > allowance:
+                run_metrics.increment("prompt_tokens_truncated", section_tokens - allowance)
+                section = self._truncate(model, section, allowance)
+            fitted.append(section)
+        return fitted
+
+    def _allowances(self, tokens: List[int], budget: int) -> List[int]:
+        """Split the budget so short sections keep their size and long ones share the rest equally."""
+        allowances = list(tokens)
+        remaining = budget
+        pending = sorted(range(len(tokens)), key=lambda i: tokens[i])
+        while pending:
+            share = remaining // len(pending)
+            index = pending[0]
+            if tokens[index] <= share:
+                remaining -= tokens[index]
+                pending.pop(0)
+                continue
+            for index in pending:
+                allowances[index] = share
+            break
+        return allowances
+
+    def _compact(self, text: str) -> str:
+        """Collapse runs of spaces and blank lines."""
+        text = re.sub(r"[ \t]+", " ", text)
+        return re.sub(r"\n\s*\n+", "\n\n", text).strip()
+
+    def _truncate(self, model: str, text: str, allowance: int) -> str:
+        """Keep the beginning and end of a text within an allowance, marking the cut."""
+        with self._lock:
+            ratio = self._ratios.get(model, self.chars_per_token)
+        keep = int(max(0, allowance - 16) * ratio)
+        if keep <= 0:
+            return "[... omitted to fit the context window ...]"
+        head = text[:keep * 2 // 3]
+        tail = text[len(text) - keep // 3:]
+        # Cut on line boundaries where possible so no turn is split mid-sentence
+        head = head[:head.rfind("\n")] if "\n" in head else head
+        tail = tail[tail.find("\n") + 1:] if "\n" in tail else tail
+        omitted = self.count(model, text) - self.count(model, head + tail)
+        return f"{head}\n[... {omitted} tokens omitted to fit the context window ...]\n{tail}"
@@ -1,35 +1,80 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+import contextvars
 import re
-from crewai import Crew, Task
+import threading
+import time
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from crewai import Task
 
 from src.utils.agent_factory import AgentFactory
+from src.utils.metrics import run_metrics
+from src.utils.requisition_store import RequisitionStore
+from src.utils.resume_extractor import resume_profile
+from src.utils.run_store import RunStore
+
+# Order in which hire decisions rank candidates in the cross-candidate comparison
+DECISION_RANK = ["Hire", "Consider", "No clear recommendation", "Do Not Hire"]
 
 
 class WorkflowEngine:
     """Engine for running task workflows based on configuration."""
     
-    def __init__(self, config_loader, agent_factory: AgentFactory):
+    def __init__(self, config_loader, agent_factory: AgentFactory, run_dir: str = "./data/runs",
+                 requisition_path: str = "./data/index/requisitions.db", human_input: bool = True):
         """
         Initialize the workflow engine.
         
         Args:
             config_loader: Configuration loader instance
             agent_factory: Agent factory instance
+            run_dir: Directory where each run checkpoints its completed tasks
+            requisition_path: SQLite file of approved job descriptions shared across workflows
+            human_input: False runs tasks marked `human_input_required` without the human
+                review, for processes nobody can answer prompts in (e.g. batch workers)
         """
         self.config_loader = config_loader
         self.agent_factory = agent_factory
+        self.run_store = RunStore(run_dir)
+        self.requisition_store = RequisitionStore(requisition_path)
+        self.human_input = human_input
+        # Shared by every run of this engine, since concurrent runs use the same agents
+        self._agent_locks = {}
+        self._locks_lock = threading.Lock()
+        self._human_input_lock = threading.Lock()
     
-    def run_workflow(self, workflow_id: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+    def run_workflow(self, workflow_id: str, context: Dict[str, Any] = None,
+                     resume_run_id: Optional[str] = None, regenerate: bool = False) -> Dict[str, Any]:
         """
         Run a workflow by ID.
         
+        Every completed task is checkpointed under a run ID. Resuming a run skips
+        the tasks it already completed and feeds their stored outputs forward.
+        Tasks marked `requisition: true` reuse the output approved for the same
+        job title, skills and experience by any earlier workflow. With `fan_out:`,
+        the listed tasks run once per candidate the source task selects, as
+        `<task_id>@<resume file>`, and the results include a comparison of the
+        candidates.
+        
         Args:
             workflow_id: ID of the workflow to run
             context: Optional context data for the workflow
+            resume_run_id: ID of an earlier run of this workflow to resume
+            regenerate: Run requisition tasks even when an approved output exists
             
         Returns:
-            Dict[str, Any]: Results of the workflow execution
+            Dict[str, Any]: Results of the workflow execution, including its run ID and run metrics
+        
+        Raises:
+            Exception: Any error that failed the run; once the run was created, the error
+                carries its ID as `run_id` so the run can be resumed
         """
+        # Each run counts into its own metrics, even when several runs share the process
+        return contextvars.copy_context().run(self._run_workflow, workflow_id, context, resume_run_id, regenerate)
+    
+    def _run_workflow(self, workflow_id: str, context: Optional[Dict[str, Any]],
+                      resume_run_id: Optional[str], regenerate: bool) -> Dict[str, Any]:
+        """Run a workflow in the current context; see `run_workflow`."""
         if context is None:
             context = {}
             
@@ -38,54 +83,390 @@ class WorkflowEngine:
             raise ValueError(f"No configuration found for workflow ID: {workflow_id}")
         
         task_ids = workflow_config.get("tasks", [])
-        tasks = []
+        dependencies = self._dependencies(workflow_config)
+        fan_out = self._fan_out(workflow_config)
+        self._check_context(workflow_id, task_ids, context)
+        run_metrics.start()
         
-        # Create tasks with context
+        completed = {}
+        if resume_run_id:
+            run = self.run_store.load(resume_run_id)
+            if not run:
+                raise ValueError(f"No checkpoints found for run ID: {resume_run_id}")
+            if run.get("workflow_id") != workflow_id:
+                raise ValueError(f"Run {resume_run_id} is a run of workflow {run.get('workflow_id')}, not {workflow_id}")
+            run_id = resume_run_id
+            # Per-candidate copies are stored as <task_id>@<resume file>
+            completed = {
+                task_id: output for task_id, output in self.run_store.completed_tasks(run_id).items()
+                if task_id.split("@")[0] in task_ids
+            }
+            self.run_store.set_status(run_id, "running")
+        else:
+            run_id = self.run_store.create(workflow_id, context)
+        
+        if not regenerate:
+            for task_id in task_ids:
+                task_config = self.config_loader.get_task_config(task_id) or {}
+                if task_id in completed or not task_config.get("requisition"):
+                    continue
+                approved = self.requisition_store.get(
+                    task_id, context.get("job_title", ""), context.get("skills", ""), context.get("experience", "")
+                )
+                if approved is not None:
+                    print(f"Reusing the approved output of {task_id} for this requisition")
+                    completed[task_id] = approved
+                    self.run_store.save_task(run_id, task_id, approved, 0.0)
+        
+        # Create tasks with context; completed tasks are not rebuilt, and
+        # per-candidate tasks are built once the candidates are known
+        tasks = {}
         for task_id in task_ids:
+            if task_id in completed or (fan_out and task_id in fan_out["tasks"]):
+                continue
             task_config = self.config_loader.get_task_config(task_id)
             if task_config:
-                # Replace placeholders in description
-                description = task_config.get("description", "")
-                for key, value in context.items():
-                    placeholder = f"{{{{{key}}}}}"
-                    description = description.replace(placeholder, str(value))
-                
-                # Update task config with new description
-                task_config_with_context = task_config.copy()
-                task_config_with_context["description"] = description
+                # Update task config with the rendered description
+                template = self.config_loader.get_task_template(task_id)
+                task_config_with_context = self._contextualize(task_config, template.render(context), context)
                 
                 # Create task with updated config
-                agent_id = task_config.get("agent")
-                agent_instance = self.agent_factory.get_agent(agent_id)
-                tasks.append(agent_instance.create_task(task_config_with_context))
+                agent_instance = self.agent_factory.get_agent_for_task(task_config)
+                tasks[task_id] = agent_instance.create_task(task_config_with_context)
         
         print(f"\nRunning workflow: {workflow_config.get('name')}")
         print(f"Description: {workflow_config.get('description')}")
-        print(f"Tasks: {', '.join(task_ids)}\n")
+        print(f"Tasks: {', '.join(task_ids)}")
+        print(f"Run ID: {run_id}")
+        if completed:
+            print(f"Reusing completed tasks: {', '.join(completed)}")
+        print()
+        
+        max_parallel = workflow_config.get("max_parallel", 4)
+        if fan_out:
+            # Per-candidate tasks may use every request slot the LLM endpoints admit
+            max_parallel = max(max_parallel, self.agent_factory.model_connector.capacity())
         
-        results = self._execute_tasks(tasks, context)
+        try:
+            results = self._execute_dag(
+                tasks, dependencies, context, max_parallel, run_id, completed, fan_out
+            )
+        except BaseException as error:
+            self.run_store.set_status(run_id, "failed", str(error))
+            error.run_id = run_id
+            raise
+        self.run_store.set_status(run_id, "completed")
+        results["run_id"] = run_id
+        results["metrics"] = run_metrics.snapshot()
         
         print(f"\nWorkflow '{workflow_config.get('name')}' completed.")
+        print("Run summary:")
+        print(run_metrics.report())
         return results
     
-    def _execute_tasks(self, tasks: List[Task], context: Dict[str, Any]) -> Dict[str, Any]:
+    def _contextualize(self, task_config: Dict[str, Any], description: str,
+                       context: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy a task configuration with its rendered description and context."""
+        task_config_with_context = task_config.copy()
+        task_config_with_context["description"] = description
+        task_config_with_context["context"] = context
+        if not self.human_input:
+            # Nobody can answer the review prompt in this process
+            task_config_with_context["human_input_required"] = False
+        return task_config_with_context
+    
+    def _check_context(self, workflow_id: str, task_ids: List[str], context: Dict[str, Any]) -> None:
+        """
+        Check that the context fills every placeholder of the workflow's tasks, before any task runs.
+        
+        Raises:
+            ValueError: If context values are missing
+        """
+        missing = {}
+        for task_id in task_ids:
+            template = self.config_loader.get_task_template(task_id)
+            if template and template.missing(context):
+                missing[task_id] = template.missing(context)
+        if missing:
+            details = "; ".join(f"{task_id}: {', '.join(keys)}" for task_id, keys in missing.items())
+            raise ValueError(f"Missing context values for workflow {workflow_id} ({details})")
+    
+    def _dependencies(self, workflow_config: Dict[str, Any]) -> Dict[str, List[str]]:
+        """
+        Read the task dependency graph of a workflow.
+        
+        Args:
+            workflow_config: Workflow configuration
+            
+        Returns:
+            Dict[str, List[str]]: Upstream task IDs of every task. Without `depends_on:`
+            every task depends on all tasks before it, so the tasks run in order and
+            each one sees all earlier outputs, as in a sequential crew
+        """
+        task_ids = workflow_config.get("tasks", [])
+        depends_on = workflow_config.get("depends_on")
+        if not depends_on:
+            return {task_id: task_ids[:position] for position, task_id in enumerate(task_ids)}
+        
+        dependencies = {}
+        for task_id in task_ids:
+            upstream = depends_on.get(task_id) or []
+            if isinstance(upstream, str):
+                upstream = [upstream]
+            unknown = [dependency for dependency in upstream if dependency not in task_ids]
+            if unknown:
+                raise ValueError(f"Task {task_id} depends on tasks not in the workflow: {', '.join(unknown)}")
+            dependencies[task_id] = list(upstream)
+        
+        # Reject cycles up front instead of waiting forever for tasks that can never start
+        resolved = set()
+        while len(resolved) < len(dependencies):
+            ready = [
+                task_id for task_id, upstream in dependencies.items()
+                if task_id not in resolved and all(dependency in resolved for dependency in upstream)
+            ]
+            if not ready:
+                cycle = sorted(set(dependencies) - resolved)
+                raise ValueError(f"Workflow tasks have circular dependencies: {', '.join(cycle)}")
+            resolved.update(ready)
+        return dependencies
+    
+    def _fan_out(self, workflow_config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Read the per-candidate fan-out of a workflow.
+        
+        Args:
+            workflow_config: Workflow configuration
+            
+        Returns:
+            Optional[Dict[str, Any]]: `source` task, per-candidate `tasks`, `max_candidates`
+            and `compare_by` task, or None if the workflow has no `fan_out:`
+        """
+        fan_out = workflow_config.get("fan_out")
+        if not fan_out:
+            return None
+        
+        task_ids = workflow_config.get("tasks", [])
+        source = fan_out.get("source")
+        if source not in task_ids:
+            raise ValueError(f"Fan-out source {source} is not a task of the workflow")
+        fan_out_tasks = [task_id for task_id in fan_out.get("tasks", []) if task_id in task_ids]
+        if source in fan_out_tasks:
+            raise ValueError(f"Fan-out source {source} cannot itself run per candidate")
+        return {
+            "source": source,
+            "tasks": fan_out_tasks,
+            "max_candidates": fan_out.get("max_candidates", 5),
+            "compare_by": fan_out.get("compare_by")
+        }
+    
+    def _candidate_tasks(self, fan_out: Dict[str, Any], context: Dict[str, Any],
+                         source_output: str) -> Tuple[List[Dict[str, Any]], Dict[str, Task]]:
+        """
+        Build the per-candidate copies of the fan-out tasks.
+        
+        The source task's agent reads the candidates from this run's source output.
+        Each copy gets its own agent instance, so the copies of different
+        candidates run in parallel, and the candidate's resume profile.
+        
+        Args:
+            fan_out: Fan-out settings from `_fan_out`
+            context: Context data of the workflow
+            source_output: Output of the source task in this run
+            
+        Returns:
+            Tuple[List[Dict[str, Any]], Dict[str, Task]]: Selected candidates, and their
+            tasks keyed by `<task_id>@<resume file>`
+        """
+        source_config = self.config_loader.get_task_config(fan_out["source"])
+        source_agent = self.agent_factory.get_agent_for_task(source_config)
+        candidates = source_agent.candidates(source_output, fan_out["max_candidates"])
+        
+        tasks = {}
+        for candidate in candidates:
+            with open(candidate["path"], "r", encoding="utf-8", errors="ignore") as file:
+                profile = resume_profile(file.read())
+            candidate_context = {**context, "candidate_name": candidate["name"], "resume_file": candidate["file"]}
+            section = (
+                f"\n\nCANDIDATE: {candidate['name']} (resume {candidate['file']})"
+                f"\n\nCANDIDATE PROFILE:\n{profile}"
+            )
+            for task_id in fan_out["tasks"]:
+                task_config = self.config_loader.get_task_config(task_id)
+                if not task_config:
+                    continue
+                template = self.config_loader.get_task_template(task_id)
+                task_config_with_context = self._contextualize(
+                    task_config, template.render(context) + section, candidate_context
+                )
+                agent_instance = self.agent_factory.new_agent_for_task(task_config)
+                tasks[f"{task_id}@{candidate['file']}"] = agent_instance.create_task(task_config_with_context)
+        return candidates, tasks
+    
+    def _compare_candidates(self, fan_out: Dict[str, Any], candidates: List[Dict[str, Any]],
+                            outputs: Dict[str, str]) -> str:
+        """
+        Compare the candidates by the hire decision of their `compare_by` task, then by match score.
+        
+        Args:
+            fan_out: Fan-out settings from `_fan_out`
+            candidates: Candidates the tasks ran for
+            outputs: Task outputs keyed by task ID
+            
+        Returns:
+            str: One line per candidate, best first
+        """
+        decide = None
+        if fan_out["compare_by"]:
+            compare_config = self.config_loader.get_task_config(fan_out["compare_by"]) or {}
+            if compare_config.get("agent"):
+                decide = getattr(self.agent_factory.get_agent_for_task(compare_config), "hire_decision", None)
+        
+        rows = []
+        for candidate in candidates:
+            decision, confidence = "No clear recommendation", 0.0
+            analysis = outputs.get(f"{fan_out['compare_by']}@{candidate['file']}")
+            if decide and analysis:
+                decision, confidence = decide(analysis)
+            rank = DECISION_RANK.index(decision) if decision in DECISION_RANK else len(DECISION_RANK)
+            rows.append((rank, -confidence, -candidate.get("score", 0), candidate, decision, confidence))
+        rows.sort(key=lambda row: row[:3])
+        
+        lines = [f"Compared {len(rows)} candidates:"]
+        for position, (_, _, _, candidate, decision, confidence) in enumerate(rows, 1):
+            score = f"match score {candidate['score']}, " if "score" in candidate else ""
+            lines.append(
+                f"{position}. {candidate['name']} ({candidate['file']}): {score}"
+                f"{decision} (confidence {confidence:.2f})"
+            )
+        return "\n".join(lines)
+    
+    def _agent_lock(self, agent: Any) -> threading.Lock:
+        """Get the lock that runs the tasks of an agent instance one at a time across all runs."""
+        with self._locks_lock:
+            return self._agent_locks.setdefault(id(agent), threading.Lock())
+    
+    def _execute_dag(self, tasks: Dict[str, Task], dependencies: Dict[str, List[str]],
+                     context: Dict[str, Any], max_parallel: int = 4, run_id: Optional[str] = None,
+                     completed: Optional[Dict[str, str]] = None,
+                     fan_out: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
-        Execute a sequence of tasks.
+        Execute tasks as a dependency graph, running every task whose upstream tasks are done in parallel.
+        
+        Each task receives the outputs of its direct upstream tasks as context.
+        Tasks of the same agent instance still run one at a time, also across
+        concurrent runs, since an agent does not support concurrent executions,
+        and tasks that prompt for human input run one at a time so their prompts
+        never interleave. With a fan-out, the per-candidate
+        copies of the fan-out tasks are added once the source task is done; each
+        copy depends on the same candidate's copies of its upstream fan-out tasks,
+        and tasks downstream of a fan-out task wait for all of its copies.
         
         Args:
-            tasks: List of tasks to execute
+            tasks: Tasks still to run by task ID, in workflow order
+            dependencies: Upstream task IDs of every task
             context: Context data for the tasks
+            max_parallel: Maximum number of tasks running at once
+            run_id: Run under which each completed task is checkpointed
+            completed: Stored outputs of tasks completed by an earlier attempt of the run
+            fan_out: Per-candidate fan-out settings from `_fan_out`
             
         Returns:
-            Dict[str, Any]: Results of task execution
+            Dict[str, Any]: Results of task execution, keyed by task ID
         """
-        crew = Crew(
-            tasks=tasks,
-            verbose=True
-        )
+        outputs = dict(completed or {})
+        fan_out_tasks = fan_out["tasks"] if fan_out else []
+        templates = dependencies
+        # Tasks skipped for lack of configuration do not hold up their dependents
+        dependencies = {
+            task_id: [
+                dependency for dependency in dependencies.get(task_id, [])
+                if dependency in tasks or dependency in outputs or dependency in fan_out_tasks
+            ]
+            for task_id in tasks
+        }
+        agent_locks = {id(task.agent): self._agent_lock(task.agent) for task in tasks.values()}
+        candidates = None
+        
+        def expand() -> None:
+            nonlocal candidates
+            candidates, candidate_tasks = self._candidate_tasks(fan_out, context, outputs[fan_out["source"]])
+            print(f"\nFanning out {', '.join(fan_out_tasks)} to {len(candidates)} candidates")
+            for candidate in candidates:
+                for task_id in fan_out_tasks:
+                    copy_id = f"{task_id}@{candidate['file']}"
+                    if copy_id not in candidate_tasks or copy_id in outputs:
+                        continue
+                    tasks[copy_id] = candidate_tasks[copy_id]
+                    # Per-candidate agent instances are created for this run only
+                    agent_locks.setdefault(id(tasks[copy_id].agent), threading.Lock())
+                    dependencies[copy_id] = [
+                        f"{dependency}@{candidate['file']}" if dependency in fan_out_tasks else dependency
+                        for dependency in templates.get(task_id, [])
+                        if dependency in fan_out_tasks or dependency in tasks or dependency in outputs
+                    ]
+            # Tasks downstream of a fan-out task wait for every candidate's copy
+            for task_id, upstream in dependencies.items():
+                if "@" not in task_id:
+                    dependencies[task_id] = [
+                        copy_id for dependency in upstream
+                        for copy_id in (
+                            [f"{dependency}@{candidate['file']}" for candidate in candidates
+                             if f"{dependency}@{candidate['file']}" in tasks
+                             or f"{dependency}@{candidate['file']}" in outputs]
+                            if dependency in fan_out_tasks else [dependency]
+                        )
+                    ]
+        
+        def run(task_id: str, upstream: str) -> str:
+            task = tasks[task_id]
+            # Per-candidate copies are configured as the task they were made from
+            task_config = self.config_loader.get_task_config(task_id.split("@")[0]) or {}
+            prompts = self.human_input and task_config.get("human_input_required")
+            started = time.perf_counter()
+            with agent_locks[id(task.agent)], (self._human_input_lock if prompts else nullcontext()):
+                output = task.execute_sync(agent=task.agent, context=upstream or None)
+            duration = time.perf_counter() - started
+            if run_id:
+                self.run_store.save_task(run_id, task_id, output.raw, duration)
+            reviewed = self.human_input or not task_config.get("human_input_required")
+            if task_config.get("requisition") and reviewed:
+                # The task completed, including any human review, so its output is approved
+                self.requisition_store.put(
+                    task_id.split("@")[0], context.get("job_title", ""), context.get("skills", ""),
+                    context.get("experience", ""), output.raw
+                )
+            print(f"\nTask {task_id} completed in {duration:.1f}s")
+            return output.raw
+        
+        running = {}
+        with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as executor:
+            while (fan_out and candidates is None) or any(task_id not in outputs for task_id in tasks):
+                if candidates is None and fan_out and fan_out["source"] in outputs:
+                    expand()
+                for task_id in list(tasks):
+                    if task_id in outputs or task_id in running.values():
+                        continue
+                    if all(dependency in outputs for dependency in dependencies[task_id]):
+                        upstream = "\n\n".join(
+                            f"Output of {dependency}:\n{outputs[dependency]}"
+                            for dependency in dependencies[task_id]
+                        )
+                        # Task threads print and count metrics in the run's context
+                        running[executor.submit(contextvars.copy_context().run, run, task_id, upstream)] = task_id
+                
+                if not running:
+                    # Nothing is left to run, e.g. the fan-out source was not run
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    outputs[running.pop(future)] = future.result()
+        
+        if candidates:
+            outputs["candidate_comparison"] = self._compare_candidates(fan_out, candidates, outputs)
+            print(f"\n{outputs['candidate_comparison']}")
         
-        results = crew.kickoff(inputs=context)
         return {
-            "workflow_results": results,
+            "workflow_results": outputs,
             "context": context
-        } 
\ No newline at end of file
+        }
@@ -0,0 +1,275 @@
+import contextvars
+import json
+import sys
+import threading
+import traceback
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, Optional
+
+# Address the server binds to and clients connect to unless told otherwise
+DEFAULT_URL = "http://127.0.0.1:8765"
+
+# Output of the job running in the current context; None outside jobs
+_job_output = contextvars.ContextVar("job_output", default=None)
+
+
+class _JobOutput:
+    """
+    Writer for the output of one job.
+
+    Complete lines go to the job's client as they are printed, from the engine
+    and from the task threads alike, and are echoed to the server console.
+    """
+
+    def __init__(self, emit: Callable[[Dict[str, Any]], None], console):
+        self.emit = emit
+        self.console = console
+        self._buffer = ""
+        self._lock = threading.Lock()
+
+    def write(self, text: str) -> int:
+        self.console.write(text)
+        with self._lock:
+            self._buffer += text
+            *lines, self._buffer = self._buffer.split("\n")
+        for line in lines:
+            self.emit({"event": "output", "text": line})
+        return len(text)
+
+    def flush(self) -> None:
+        self.console.flush()
+        with self._lock:
+            line, self._buffer = self._buffer, ""
+        if line:
+            self.emit({"event": "output", "text": line})
+
+
+class _OutputRouter:
+    """
+    Process-wide `sys.stdout` of the server that writes to the output of the current job.
+
+    The engine copies a run's context into its task threads, so everything a job
+    prints reaches its own client while other jobs run; output outside any job
+    goes to the console.
+    """
+
+    def __init__(self, console):
+        self.console = console
+
+    def write(self, text: str) -> int:
+        return (_job_output.get() or self.console).write(text)
+
+    def flush(self) -> None:
+        (_job_output.get() or self.console).flush()
+
+
+class WorkflowServer:
+    """
+    Long-lived process that runs workflow jobs for thin clients.
+
+    The configuration, model connector, agents and resume index are built once
+    when the server starts, and every model the agents use is loaded in
+    Ollama, so a job starts its first LLM call right away instead of paying for
+    imports, YAML parsing, agent construction and model loading on every run.
+
+    Jobs are posted to `/runs` and answered with a stream of JSON lines: one
+    `output` event per printed line, then a `completed` or `failed` event. Jobs
+    run concurrently, each with its own output, run ID and run metrics; tasks of
+    an agent shared by several jobs still run one at a time.
+    """
+
+    def __init__(self, workflow_engine, resume_index=None):
+        """
+        Initialize the server.
+
+        Args:
+            workflow_engine: Workflow engine whose agent factory and connector stay warm
+            resume_index: Resume index reconciled with the resume store before each job
+        """
+        self.workflow_engine = workflow_engine
+        self.resume_index = resume_index
+        self.active_jobs = 0
+        self._jobs_lock = threading.Lock()
+
+    def warm(self) -> None:
+        """Build the agent of every configured task and load the models they use."""
+        agent_factory = self.workflow_engine.agent_factory
+        loaded = set()
+        for task_id, task_config in self.workflow_engine.config_loader.get_all_tasks().items():
+            if not task_config.get("agent"):
+                continue
+            llm = agent_factory.get_agent_for_task(task_config).llm
+            if (llm.base_url, llm.model) in loaded:
+                continue
+            loaded.add((llm.base_url, llm.model))
+            try:
+                agent_factory.model_connector.preload(llm)
+                print(f"Loaded {llm.model} for {task_id}")
+            except Exception as error:
+                # The first request loads the model instead
+                print(f"Could not preload {llm.model}: {error}")
+
+    def run(self, job: Dict[str, Any], emit: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Run one workflow job, streaming its output.
+
+        Args:
+            job: `workflow` and `context`, or `resume_run_id`, and optionally `regenerate`
+            emit: Called with every event of the job
+        """
+        engine = self.workflow_engine
+        console = sys.stdout.console if isinstance(sys.stdout, _OutputRouter) else sys.stdout
+        token = _job_output.set(_JobOutput(emit, console))
+        with self._jobs_lock:
+            self.active_jobs += 1
+        try:
+            workflow = job.get("workflow")
+            context = job.get("context") or {}
+            resume_run_id = job.get("resume_run_id")
+            if resume_run_id:
+                # A resumed run keeps the workflow and inputs it was started with
+                run = engine.run_store.load(resume_run_id)
+                if not run:
+                    raise ValueError(f"No checkpoints found for run ID: {resume_run_id}")
+                workflow = run["workflow_id"]
+                context = run["context"]
+            if self.resume_index is not None:
+                updated, removed = self.resume_index.sync()
+                print(f"Resume index up to date ({updated} indexed, {removed} removed)")
+
+            print(f"Starting workflow: {workflow}")
+            results = engine.run_workflow(workflow, context, resume_run_id, job.get("regenerate", False))
+            sys.stdout.flush()
+            emit({
+                "event": "completed",
+                "run_id": results.get("run_id"),
+                "results": results.get("workflow_results"),
+                "metrics": results.get("metrics")
+            })
+        except Exception as error:
+            print(f"Error running workflow: {error}")
+            traceback.print_exc(file=console)
+            sys.stdout.flush()
+            emit({
+                "event": "failed",
+                "error": f"{type(error).__name__}: {error}",
+                "run_id": getattr(error, "run_id", None)
+            })
+        finally:
+            with self._jobs_lock:
+                self.active_jobs -= 1
+            _job_output.reset(token)
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+        """
+        Create an HTTP server for the jobs; call `serve_forever` on it to start answering.
+
+        From here on, `sys.stdout` sends what each job prints to that job's client.
+
+        Args:
+            host: Interface to bind
+            port: Port to bind
+
+        Returns:
+            ThreadingHTTPServer: Server handling each request on its own thread
+        """
+        server = self
+        if not isinstance(sys.stdout, _OutputRouter):
+            sys.stdout = _OutputRouter(sys.stdout)
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send_json(self, status: int, response: Dict[str, Any]) -> None:
+                payload = json.dumps(response).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self) -> None:
+                if self.path != "/health":
+                    self._send_json(404, {"error": f"Unknown path: {self.path}"})
+                    return
+                self._send_json(200, {
+                    "status": "ok",
+                    "active_jobs": server.active_jobs,
+                    "workflows": list(server.workflow_engine.config_loader.get_all_workflows())
+                })
+
+            def do_POST(self) -> None:
+                if self.path != "/runs":
+                    self._send_json(404, {"error": f"Unknown path: {self.path}"})
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                    job = json.loads(self.rfile.read(length)) if length else {}
+                except ValueError as error:
+                    self._send_json(400, {"error": f"Invalid job: {error}"})
+                    return
+
+                # Events are streamed until the job ends, then the connection closes
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                connected = [True]
+                write_lock = threading.Lock()
+
+                def emit(event: Dict[str, Any]) -> None:
+                    with write_lock:
+                        if not connected[0]:
+                            return
+                        try:
+                            self.wfile.write((json.dumps(event, default=str) + "\n").encode("utf-8"))
+                            self.wfile.flush()
+                        except OSError:
+                            # The client went away; the run goes on and is checkpointed as usual
+                            connected[0] = False
+
+                server.run(job, emit)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                # Job output is already echoed to the console
+                pass
+
+        return ThreadingHTTPServer((host, port), Handler)
+
+
+def server_available(url: str = DEFAULT_URL, timeout: float = 1.0) -> bool:
+    """Check whether a workflow server answers at a URL."""
+    try:
+        with urllib.request.urlopen(f"{url}/health", timeout=timeout) as response:
+            return response.status == 200
+    except (OSError, ValueError):
+        return False
+
+
+def submit(url: str, workflow: Optional[str], context: Optional[Dict[str, Any]] = None,
+           resume_run_id: Optional[str] = None, regenerate: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Run a workflow on a workflow server.
+
+    Args:
+        url: Base URL of the server
+        workflow: ID of the workflow to run
+        context: Context data for the workflow
+        resume_run_id: ID of a failed run to resume instead
+        regenerate: Generate a new job description even if one was approved
+
+    Yields:
+        Dict[str, Any]: Events of the job as they happen, ending with `completed` or `failed`
+
+    Raises:
+        urllib.error.URLError: If the server cannot be reached
+    """
+    job = {"workflow": workflow, "context": context or {}, "resume_run_id": resume_run_id, "regenerate": regenerate}
+    request = urllib.request.Request(
+        f"{url}/runs", data=json.dumps(job).encode("utf-8"),
+        headers={"Content-Type": "application/json"}, method="POST"
+    )
+    with urllib.request.urlopen(request) as response:
+        for line in response:
+            if line.strip():
+                yield json.loads(line)